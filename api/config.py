@@ -18,35 +18,57 @@ class Settings(BaseSettings):
     # Model settings
     model_path: str = ""  # Empty = auto download from HF
     hf_model_id: str = "openbmb/VoxCPM1.5"
+    preload_model: bool = True  # Load the model at startup instead of on the first request
     enable_denoiser: bool = False  # Disabled by default (requires CUDA, causes issues on Mac/MPS)
     zipenhancer_model_path: str = "iic/speech_zipenhancer_ans_multiloss_16k_base"
     
     # ASR settings (for prompt text recognition)
     asr_model_id: str = "iic/SenseVoiceSmall"
+    preload_asr_model: bool = True  # Also load ASR at startup (with preload_model)
+    asr_batch_max_size: int = 8  # Prompt audios recognized together in one ASR call
+    asr_batch_wait_ms: int = 20  # How long an ASR request waits for others to batch with
     
     # Storage settings
     voices_dir: str = "./voices"
     generated_audio_dir: str = "./generated"
+    voice_cache_ttl_seconds: int = 60  # How often voices.json is re-checked for external changes
     
     # TTS settings
     default_cfg_value: float = 2.0
     default_inference_timesteps: int = 10
     max_text_length: int = 5000  # Maximum text length per request
+    max_json_body_mb: int = 21  # JSON request body cap (fits a 15 MB temp_audio_base64)
+    max_voice_upload_mb: int = 50  # Reference audio upload cap for POST /voices
     split_max_length: int = 300  # Max chars per segment for splitting
+    stream_base64_response: bool = False  # Stream base64 JSON responses in chunks instead of one body
+    stream_gzip: bool = False  # Gzip SSE streams for clients sending Accept-Encoding: gzip
+    prompt_cache_max_voices: int = 32  # Stored voices whose encoded prompt is kept in memory
     
     # Queue settings
     queue_type: Literal["memory", "redis"] = "memory"
     queue_max_size: int = 100
-    worker_count: int = 1
+    worker_count: int = 2  # Audio encoding/decoding threads (2-4); inference and ASR each use their own thread
     
-    # Redis settings (for future scaling)
+    # Batching settings (coalesce concurrent /tts/generate requests)
+    batch_max_size: int = 8
+    batch_max_wait_ms: int = 50
+    batch_worker_enabled: bool = True  # Run the batch worker in this process (redis: one per GPU)
+    
+    # Response cache (identical text/voice/parameters reuse generated audio)
+    response_cache_enabled: bool = True
+    response_cache_max_mb: int = 256  # In-process LRU size (queue_type = "memory")
+    response_cache_ttl_seconds: int = 3600  # Entry lifetime (queue_type = "redis")
+    
+    # Redis settings (queue_type = "redis", shared queue across uvicorn workers)
     redis_host: str = "localhost"
     redis_port: int = 6379
     redis_db: int = 0
+    redis_pool_size: int = 32  # Clamped to 2-256; up to 3/4 of it held by requests waiting for results
+    redis_result_timeout: int = 300  # Seconds a request waits for its result
     
     # Cleanup settings
     generated_audio_expire_hours: int = 24
-    cleanup_interval_minutes: int = 60
+    cleanup_interval_minutes: int = 60  # Longest sleep between cleanups (wakes earlier when a file is due)
     
     class Config:
         env_prefix = "VOXCPM_"
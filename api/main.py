@@ -7,9 +7,11 @@ TTS API service for VoxCPM model with support for:
 - Automatic text splitting for long inputs
 - Temporary and persistent voice support
 """
+import sys
 import asyncio
 import logging
 from contextlib import asynccontextmanager
+from typing import Set
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -17,7 +19,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
 from .routers import voices, tts, downloads, v2
 from .utils.cleanup import cleanup_task, get_audio_manager
+from .utils.middleware import BodySizeLimitMiddleware
+from .models.schemas import MAX_TEMP_AUDIO_BYTES
 from .services.tts_service import get_tts_service
+from .services.batcher import get_batcher
+from .services.podcast_jobs import get_podcast_jobs
+from .services.redis_pool import init_redis_pool, close_redis_pool
 
 # Configure logging
 logging.basicConfig(
@@ -27,42 +34,65 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# Background tasks
-cleanup_task_handle = None
+# Background tasks (strong references so they are not garbage collected mid-run)
+background_tasks: Set[asyncio.Task] = set()
+
+
+def track_task(task: asyncio.Task) -> asyncio.Task:
+    """Keep a reference to a background task until it finishes."""
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
-    global cleanup_task_handle
-    
     logger.info("Starting VoxCPM API server...")
     logger.info(f"Model: {settings.hf_model_id}")
     logger.info(f"Voices directory: {settings.voices_dir}")
     logger.info(f"Generated audio directory: {settings.generated_audio_dir}")
     
     # Start cleanup background task
-    cleanup_task_handle = asyncio.create_task(cleanup_task())
+    track_task(asyncio.create_task(cleanup_task()))
     logger.info("Started cleanup background task")
     
-    # Pre-load model if not lazy loading
-    # Uncomment the following to load model on startup:
-    # logger.info("Pre-loading TTS model...")
-    # tts_service = get_tts_service()
-    # await tts_service._ensure_model_loaded()
-    # logger.info("TTS model loaded")
+    # Shared Redis queue for all uvicorn workers
+    if settings.queue_type == "redis":
+        init_redis_pool()
+    
+    # Start request batcher worker
+    if settings.batch_worker_enabled:
+        track_task(get_batcher().start())
+        logger.info(
+            f"Started TTS batcher (queue={settings.queue_type}, max_batch_size={settings.batch_max_size}, "
+            f"max_wait_ms={settings.batch_max_wait_ms})"
+        )
+    
+    # Start podcast job worker (memory queue jobs only run in this process)
+    if settings.batch_worker_enabled or settings.queue_type == "memory":
+        track_task(get_podcast_jobs().start(v2.run_podcast))
+        logger.info("Started podcast job worker")
+    
+    # Load the model in the background so the first request doesn't pay for it
+    # (requests arriving earlier wait for the same load)
+    if settings.preload_model:
+        track_task(asyncio.create_task(get_tts_service().startup(load_asr=settings.preload_asr_model)))
+        logger.info("Pre-loading TTS model...")
     
     yield
     
     # Shutdown
     logger.info("Shutting down VoxCPM API server...")
     
-    if cleanup_task_handle:
-        cleanup_task_handle.cancel()
-        try:
-            await cleanup_task_handle
-        except asyncio.CancelledError:
-            pass
+    await get_batcher().stop()
+    await get_podcast_jobs().stop()
+    
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    
+    await close_redis_pool()
     
     logger.info("Shutdown complete")
 
@@ -102,6 +132,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversize JSON bodies and uploads before they are buffered; upload
+# limits leave room for the text fields and part headers of the form
+MULTIPART_FORM_OVERHEAD_BYTES = 64 * 1024
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_bytes=settings.max_json_body_mb * 1024 * 1024,
+    multipart_limits={
+        f"{tts.router.prefix}/generate/multipart": MAX_TEMP_AUDIO_BYTES + MULTIPART_FORM_OVERHEAD_BYTES,
+        voices.router.prefix: settings.max_voice_upload_mb * 1024 * 1024 + MULTIPART_FORM_OVERHEAD_BYTES,
+    },
+)
+
 # Include routers
 app.include_router(voices.router)
 app.include_router(tts.router)
@@ -139,6 +181,9 @@ def run_server():
         port=settings.port,
         reload=settings.debug,
         log_level="debug" if settings.debug else "info",
+        # uvloop + httptools ship with uvicorn[standard]; uvloop has no Windows build
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
     )
 
 
@@ -5,6 +5,36 @@ from datetime import datetime
 from typing import Optional, List, Literal, Any
 from pydantic import BaseModel, Field
 
+__all__ = [
+    # Voice
+    "VoiceCreate",
+    "VoiceResponse",
+    "VoiceListResponse",
+    "VoiceUpdateRequest",
+    "VoiceDeleteResponse",
+    # V2 (Podcast)
+    "V2VoiceInfo",
+    "V2VoiceListData",
+    "V2VoiceListResponse",
+    "V2VoiceUpdateResponse",
+    "V2ErrorResponse",
+    "PodcastSegmentInput",
+    "PodcastGenerateRequest",
+    "PodcastSegmentTimeline",
+    "PodcastGenerateData",
+    "PodcastGenerateResponse",
+    "PodcastJobData",
+    "PodcastJobResponse",
+    # TTS
+    "TTSGenerateRequest",
+    "TTSGenerateResponse",
+    "TTSStreamEvent",
+    # Generated audio
+    "GeneratedAudioInfo",
+    # Errors
+    "ErrorResponse",
+]
+
 
 # ============== Voice Schemas ==============
 
@@ -20,11 +50,6 @@ class VoiceResponse(BaseModel):
     voice_name: str = Field(..., description="音色名称")
     prompt_text: str = Field(..., description="参考音频对应的文本")
     created_at: datetime = Field(..., description="创建时间")
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 
 class VoiceListResponse(BaseModel):
@@ -93,6 +118,22 @@ class PodcastGenerateResponse(BaseModel):
     error: Optional[str] = Field(None, description="错误信息")
 
 
+class PodcastJobData(BaseModel):
+    """Data wrapper for an asynchronous podcast job"""
+    audio_id: str = Field(..., description="任务 ID（同时作为生成音频的 ID）")
+    status: Literal["pending", "running", "done", "failed"] = Field(..., description="任务状态")
+    status_url: str = Field(..., description="任务状态查询链接")
+    result: Optional[PodcastGenerateData] = Field(None, description="生成结果（status 为 done 时）")
+    error: Optional[str] = Field(None, description="失败原因（status 为 failed 时）")
+
+
+class PodcastJobResponse(BaseModel):
+    """Schema for podcast job submit/status response"""
+    success: bool = Field(True, description="是否成功")
+    data: Optional[PodcastJobData] = Field(None, description="响应数据")
+    error: Optional[str] = Field(None, description="错误信息")
+
+
 class V2ErrorResponse(BaseModel):
     """Schema for v2 error response"""
     success: bool = Field(False, description="是否成功")
@@ -123,11 +164,20 @@ class VoiceDeleteResponse(BaseModel):
 
 # ============== TTS Schemas ==============
 
+# Temporary voice size cap (15 MB), and its base64 length; longer payloads
+# are rejected before anything is decoded
+MAX_TEMP_AUDIO_BYTES = 15_000_000
+MAX_TEMP_AUDIO_BASE64_LENGTH = 20_000_000
+
 class TTSGenerateRequest(BaseModel):
     """Schema for TTS generation request"""
     text: str = Field(..., min_length=1, max_length=5000, description="要合成的文本")
     voice_uuid: Optional[str] = Field(None, description="已上传音色的UUID")
-    temp_audio_base64: Optional[str] = Field(None, description="临时音色音频(Base64编码)")
+    temp_audio_base64: Optional[str] = Field(
+        None,
+        max_length=MAX_TEMP_AUDIO_BASE64_LENGTH,
+        description="临时音色音频(Base64编码，解码后最大15MB)",
+    )
     temp_prompt_text: Optional[str] = Field(None, description="临时音色对应的文本，不填则自动ASR识别")
     cfg_value: Optional[float] = Field(None, ge=1.0, le=5.0, description="CFG值，默认2.0")
     inference_timesteps: Optional[int] = Field(None, ge=4, le=50, description="推理步数，默认10")
@@ -2,13 +2,16 @@
 Downloads API routes for retrieving saved generated audio.
 """
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
 
 from ..models.schemas import GeneratedAudioInfo, ErrorResponse
 from ..utils.cleanup import get_audio_manager
+from ..utils.responses import AudioFileResponse
 
 router = APIRouter(prefix="/downloads", tags=["downloads"])
 
+# Audio manager singleton, bound once instead of looked up per request
+audio_manager = get_audio_manager()
+
 
 @router.get(
     "/{audio_id}",
@@ -16,12 +19,10 @@ router = APIRouter(prefix="/downloads", tags=["downloads"])
         404: {"model": ErrorResponse, "description": "Audio not found or expired"},
     },
     summary="下载生成的音频",
-    description="下载之前保存的生成音频文件。文件在24小时后过期。"
+    description="下载之前保存的生成音频文件。文件在24小时后过期。支持 HTTP Range 请求（206 Partial Content），便于播放器拖动进度。"
 )
 async def download_audio(audio_id: str):
     """Download a generated audio file."""
-    audio_manager = get_audio_manager()
-    
     audio_path = audio_manager.get_audio_path(audio_id)
     if not audio_path:
         raise HTTPException(
@@ -31,7 +32,7 @@ async def download_audio(audio_id: str):
     
     info = audio_manager.get_audio_info(audio_id)
     
-    return FileResponse(
+    return AudioFileResponse(
         path=str(audio_path),
         media_type="audio/wav" if info["format"] == "wav" else "audio/mpeg",
         filename=info["filename"],
@@ -54,8 +55,6 @@ async def download_audio(audio_id: str):
 )
 async def get_audio_info(audio_id: str):
     """Get information about a generated audio file."""
-    audio_manager = get_audio_manager()
-    
     info = audio_manager.get_audio_info(audio_id)
     if not info:
         raise HTTPException(
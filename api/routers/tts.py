@@ -1,12 +1,18 @@
 """
 TTS generation API routes.
 """
+import os
 import uuid
-import json
+import shutil
+import asyncio
+import tempfile
+import zlib
 import logging
+import orjson
+import numpy as np
 from datetime import datetime, timedelta
-from typing import Optional
-from fastapi import APIRouter, HTTPException, Response, status
+from typing import Optional, List, Literal, Iterator, AsyncIterator
+from fastapi import APIRouter, File, Form, Header, UploadFile, HTTPException, Response, status
 from fastapi.responses import StreamingResponse
 
 logger = logging.getLogger(__name__)
@@ -16,17 +22,154 @@ from ..models.schemas import (
     TTSGenerateRequest,
     TTSGenerateResponse,
     ErrorResponse,
+    MAX_TEMP_AUDIO_BYTES,
 )
-from ..services.tts_service import get_tts_service
+from ..services.tts_service import get_tts_service, InvalidAudioError
+from ..services.batcher import get_batcher
+from ..services.response_cache import get_response_cache
 from ..utils.cleanup import get_audio_manager
+from ..utils.responses import FastJSONResponse
 
 router = APIRouter(prefix="/tts", tags=["tts"])
 
+# Service singletons, bound once instead of looked up per request
+tts_service = get_tts_service()
+audio_manager = get_audio_manager()
+
+# SSE events larger than this are gzip-compressed off the event loop
+GZIP_INLINE_MAX_BYTES = 16 * 1024
+
+
+def _stream_base64_json(chunks: Iterator[str], metadata: dict) -> Iterator[str]:
+    """Emit a TTSGenerateResponse-shaped JSON body with a streamed audio_base64 field."""
+    yield '{"audio_base64": "'
+    yield from chunks
+    yield '", ' + orjson.dumps(metadata).decode()[1:]
+
+
+async def _build_tts_response(
+    request: TTSGenerateRequest,
+    audio: np.ndarray,
+    sample_rate: int,
+    segments: List[str],
+) -> Response:
+    """
+    Build the /tts/generate response for generated audio.
+    
+    Args:
+        request: Original request (output_format, save_result)
+        audio: Generated audio array
+        sample_rate: Audio sample rate
+        segments: Text segments the audio was generated from
+    
+    Returns:
+        JSON (base64) or audio file response
+    """
+    duration_seconds = audio.shape[-1] / sample_rate
+    
+    # Handle output format
+    if request.output_format == "base64":
+        # Handle save_result
+        download_url = None
+        expires_at = None
+        
+        if request.save_result:
+            audio_bytes = await asyncio.to_thread(tts_service.audio_to_bytes, audio)
+            audio_id = str(uuid.uuid4())
+            meta = await asyncio.to_thread(
+                audio_manager.save_audio,
+                audio_id=audio_id,
+                audio_data=audio_bytes,
+                format="wav",
+                sample_rate=sample_rate,
+                duration_seconds=duration_seconds,
+            )
+            download_url = f"/downloads/{audio_id}"
+            expires_at = datetime.fromisoformat(meta["expires_at"])
+        
+        # Built by hand (matches TTSGenerateResponse) to skip response-model
+        # validation and re-serialization of the large base64 string
+        metadata = {
+            "sample_rate": sample_rate,
+            "duration_seconds": round(duration_seconds, 3),
+            "segments": len(segments),
+            "format": "wav",
+            "download_url": download_url,
+            "expires_at": expires_at.isoformat() if expires_at else None,
+        }
+        
+        if settings.stream_base64_response:
+            # Stream the JSON body so the base64 payload is never built in one piece
+            return StreamingResponse(
+                _stream_base64_json(tts_service.audio_to_base64_iter(audio), metadata),
+                media_type="application/json",
+            )
+        
+        audio_base64 = await asyncio.to_thread(tts_service.audio_to_base64, audio)
+        
+        return FastJSONResponse({"audio_base64": audio_base64, **metadata})
+    
+    else:
+        # Return audio file directly (encoding runs off the event loop)
+        audio_bytes = await asyncio.to_thread(tts_service.audio_to_bytes, audio, request.output_format)
+        
+        # Save if requested
+        headers = {}
+        if request.save_result:
+            audio_id = str(uuid.uuid4())
+            meta = await asyncio.to_thread(
+                audio_manager.save_audio,
+                audio_id=audio_id,
+                audio_data=audio_bytes,
+                format=request.output_format,
+                sample_rate=sample_rate,
+                duration_seconds=duration_seconds,
+            )
+            headers["X-Download-URL"] = f"/downloads/{audio_id}"
+            headers["X-Expires-At"] = meta["expires_at"]
+        
+        content_type = "audio/wav" if request.output_format == "wav" else "audio/mpeg"
+        
+        return Response(
+            content=audio_bytes,
+            media_type=content_type,
+            headers={
+                "Content-Disposition": f"attachment; filename=tts_output.{request.output_format}",
+                "X-Sample-Rate": str(sample_rate),
+                "X-Duration-Seconds": str(round(duration_seconds, 3)),
+                "X-Segments": str(len(segments)),
+                **headers,
+            }
+        )
+
+
+async def _gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Gzip-compress a byte stream, flushing after every chunk.
+    
+    Z_SYNC_FLUSH keeps each SSE event decodable as soon as it arrives while
+    still sharing the compression window across events. Level 1 gets most
+    of the gain on base64 audio; audio chunks are compressed in a worker
+    thread so they never block the event loop.
+    """
+    compressor = zlib.compressobj(1, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    
+    def compress(chunk: bytes) -> bytes:
+        return compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    
+    async for chunk in chunks:
+        if len(chunk) > GZIP_INLINE_MAX_BYTES:
+            yield await asyncio.to_thread(compress, chunk)
+        else:
+            yield compress(chunk)
+    yield compressor.flush()
+
 
 @router.post(
     "/generate",
-    response_model=TTSGenerateResponse,
+    response_model=None,
     responses={
+        200: {"model": TTSGenerateResponse, "description": "Audio as base64 JSON (output_format=base64) or audio file"},
         400: {"model": ErrorResponse, "description": "Invalid request"},
         404: {"model": ErrorResponse, "description": "Voice not found"},
         500: {"model": ErrorResponse, "description": "Server error"},
@@ -60,94 +203,160 @@ async def generate_tts(request: TTSGenerateRequest):
         )
     
     try:
-        tts_service = get_tts_service()
-        
-        # Generate audio
-        audio, sample_rate, segments = await tts_service.generate(
-            text=request.text,
-            voice_uuid=request.voice_uuid,
-            temp_audio_base64=request.temp_audio_base64,
-            temp_prompt_text=request.temp_prompt_text,
-            cfg_value=request.cfg_value,
-            inference_timesteps=request.inference_timesteps,
-            normalize=request.normalize,
-            denoise=request.denoise,
-        )
+        # Identical requests reuse earlier audio instead of re-running the model
+        cache = get_response_cache()
+        cache_key = cache.make_key(request) if settings.response_cache_enabled else None
+        cached = await cache.get(cache_key) if cache_key else None
         
-        duration_seconds = len(audio) / sample_rate
+        if cached is not None:
+            audio, sample_rate, segments = cached
+        else:
+            # Generate audio (coalesced with concurrent requests by the batcher)
+            audio, sample_rate, segments = await get_batcher().submit(request)
+            if cache_key:
+                await cache.set(cache_key, (audio, sample_rate, segments))
         
-        # Handle output format
-        if request.output_format == "base64":
-            audio_base64 = tts_service.audio_to_base64(audio)
-            
-            # Handle save_result
-            download_url = None
-            expires_at = None
-            
-            if request.save_result:
-                audio_bytes = tts_service.audio_to_bytes(audio)
-                audio_id = str(uuid.uuid4())
-                audio_manager = get_audio_manager()
-                meta = audio_manager.save_audio(
-                    audio_id=audio_id,
-                    audio_data=audio_bytes,
-                    format="wav",
-                    sample_rate=sample_rate,
-                    duration_seconds=duration_seconds,
+        return await _build_tts_response(request, audio, sample_rate, segments)
+    
+    except InvalidAudioError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.exception("TTS generation failed")
+        raise HTTPException(status_code=500, detail=f"TTS generation failed: {str(e)}")
+
+
+def _save_upload(upload: UploadFile) -> str:
+    """
+    Copy a spooled upload to a named temporary file for the model.
+    
+    Args:
+        upload: Uploaded temporary voice
+    
+    Returns:
+        Path of the temporary file (removed by the caller)
+    """
+    ext = os.path.splitext(upload.filename or "")[1].lower() or ".wav"
+    with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as temp_file:
+        try:
+            shutil.copyfileobj(upload.file, temp_file, 1024 * 1024)
+            size = temp_file.tell()
+            if size == 0:
+                raise HTTPException(status_code=400, detail="Empty audio file")
+            if size > MAX_TEMP_AUDIO_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Temporary audio too large. Maximum size: {MAX_TEMP_AUDIO_BYTES} bytes"
                 )
-                download_url = f"/downloads/{audio_id}"
-                expires_at = datetime.fromisoformat(meta["expires_at"])
+        except BaseException:
+            temp_file.close()
+            _remove_file(temp_file.name)
+            raise
+    return temp_file.name
+
+
+def _remove_file(path: str):
+    """Remove a file, ignoring errors."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+@router.post(
+    "/generate/multipart",
+    response_model=None,
+    responses={
+        200: {"model": TTSGenerateResponse, "description": "Audio as base64 JSON (output_format=base64) or audio file"},
+        400: {"model": ErrorResponse, "description": "Invalid request"},
+        404: {"model": ErrorResponse, "description": "Voice not found"},
+        413: {"model": ErrorResponse, "description": "Temporary audio too large"},
+        500: {"model": ErrorResponse, "description": "Server error"},
+    },
+    summary="同步TTS生成 (multipart)",
+    description="""
+    与 `/tts/generate` 相同，但以 multipart/form-data 提交，临时音色以文件上传（最大15MB）。
+    上传文件流式写入临时文件，不会像 Base64 JSON 那样在内存中保留多份副本。
+    """
+)
+async def generate_tts_multipart(
+    text: str = Form(..., min_length=1, max_length=5000, description="要合成的文本"),
+    voice_uuid: Optional[str] = Form(None, description="已上传音色的UUID"),
+    temp_audio: Optional[UploadFile] = File(None, description="临时音色音频文件"),
+    temp_prompt_text: Optional[str] = Form(None, description="临时音色对应的文本，不填则自动ASR识别"),
+    cfg_value: Optional[float] = Form(None, ge=1.0, le=5.0, description="CFG值，默认2.0"),
+    inference_timesteps: Optional[int] = Form(None, ge=4, le=50, description="推理步数，默认10"),
+    normalize: bool = Form(False, description="是否启用文本正则化"),
+    denoise: bool = Form(False, description="是否启用参考音频降噪"),
+    output_format: Literal["wav", "mp3", "base64"] = Form("wav", description="输出格式"),
+    save_result: bool = Form(False, description="是否保存结果到服务器(24小时过期)"),
+):
+    """Generate speech from text, with the temporary voice uploaded as a file."""
+    if len(text.strip()) == 0:
+        raise HTTPException(status_code=400, detail="Text cannot be empty")
+    
+    if len(text) > settings.max_text_length:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Text too long. Maximum length: {settings.max_text_length} characters"
+        )
+    
+    if voice_uuid and temp_audio:
+        raise HTTPException(
+            status_code=400,
+            detail="Cannot use both voice_uuid and temp_audio. Choose one."
+        )
+    
+    if temp_audio and temp_audio.size is not None and temp_audio.size > MAX_TEMP_AUDIO_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Temporary audio too large. Maximum size: {MAX_TEMP_AUDIO_BYTES} bytes"
+        )
+    
+    request = TTSGenerateRequest(
+        text=text,
+        voice_uuid=voice_uuid,
+        temp_prompt_text=temp_prompt_text,
+        cfg_value=cfg_value,
+        inference_timesteps=inference_timesteps,
+        normalize=normalize,
+        denoise=denoise,
+        output_format=output_format,
+        save_result=save_result,
+    )
+    
+    temp_path = None
+    try:
+        if temp_audio:
+            temp_path = await asyncio.to_thread(_save_upload, temp_audio)
             
-            return TTSGenerateResponse(
-                audio_base64=audio_base64,
-                sample_rate=sample_rate,
-                duration_seconds=round(duration_seconds, 3),
-                segments=len(segments),
-                format="wav",
-                download_url=download_url,
-                expires_at=expires_at,
+            audio, sample_rate, segments = await tts_service.generate(
+                text=request.text,
+                temp_prompt_text=request.temp_prompt_text,
+                cfg_value=request.cfg_value,
+                inference_timesteps=request.inference_timesteps,
+                normalize=request.normalize,
+                denoise=request.denoise,
+                temp_audio_path=temp_path,
             )
-        
         else:
-            # Return audio file directly
-            audio_bytes = tts_service.audio_to_bytes(audio, request.output_format)
-            
-            # Save if requested
-            headers = {}
-            if request.save_result:
-                audio_id = str(uuid.uuid4())
-                audio_manager = get_audio_manager()
-                meta = audio_manager.save_audio(
-                    audio_id=audio_id,
-                    audio_data=audio_bytes,
-                    format=request.output_format,
-                    sample_rate=sample_rate,
-                    duration_seconds=duration_seconds,
-                )
-                headers["X-Download-URL"] = f"/downloads/{audio_id}"
-                headers["X-Expires-At"] = meta["expires_at"]
-            
-            content_type = "audio/wav" if request.output_format == "wav" else "audio/mpeg"
-            
-            return Response(
-                content=audio_bytes,
-                media_type=content_type,
-                headers={
-                    "Content-Disposition": f"attachment; filename=tts_output.{request.output_format}",
-                    "X-Sample-Rate": str(sample_rate),
-                    "X-Duration-Seconds": str(round(duration_seconds, 3)),
-                    "X-Segments": str(len(segments)),
-                    **headers,
-                }
-            )
+            audio, sample_rate, segments = await get_batcher().submit(request)
+        
+        return await _build_tts_response(request, audio, sample_rate, segments)
     
+    except HTTPException:
+        raise
+    except InvalidAudioError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        import traceback
-        error_detail = traceback.format_exc()
-        logger.error(f"TTS generation failed: {error_detail}")
+        logger.exception("TTS generation failed")
         raise HTTPException(status_code=500, detail=f"TTS generation failed: {str(e)}")
+    finally:
+        if temp_path:
+            await asyncio.to_thread(_remove_file, temp_path)
 
 
 @router.post(
@@ -168,7 +377,10 @@ async def generate_tts(request: TTSGenerateRequest):
     - error: 错误信息
     """
 )
-async def generate_tts_stream(request: TTSGenerateRequest):
+async def generate_tts_stream(
+    request: TTSGenerateRequest,
+    accept_encoding: Optional[str] = Header(None, include_in_schema=False),
+):
     """Generate speech from text with streaming response (SSE)."""
     # Validate request
     if len(request.text.strip()) == 0:
@@ -188,11 +400,6 @@ async def generate_tts_stream(request: TTSGenerateRequest):
     
     async def event_generator():
         """Generate SSE events."""
-        tts_service = get_tts_service()
-        
-        all_audio_chunks = []
-        total_duration = 0.0
-        
         async for event in tts_service.generate_streaming(
             text=request.text,
             voice_uuid=request.voice_uuid,
@@ -205,11 +412,6 @@ async def generate_tts_stream(request: TTSGenerateRequest):
         ):
             event_type = event.get("event", "message")
             
-            # Collect chunks for potential save
-            if event_type == "audio_chunk":
-                all_audio_chunks.append(event.get("audio_base64", ""))
-                total_duration += event.get("duration", 0)
-            
             # Handle save_result on done event
             if event_type == "done" and request.save_result:
                 # This is a simplified version - in production you might want to
@@ -217,16 +419,29 @@ async def generate_tts_stream(request: TTSGenerateRequest):
                 event["download_url"] = None  # Streaming doesn't support save currently
                 event["expires_at"] = None
             
-            # Format as SSE
-            data = json.dumps(event, ensure_ascii=False, default=str)
-            yield f"event: {event_type}\ndata: {data}\n\n"
+            # Format as SSE, as bytes so the base64 audio isn't decoded and
+            # re-encoded on its way out
+            yield b"".join((
+                b"event: ", event_type.encode(), b"\ndata: ",
+                orjson.dumps(event, default=str), b"\n\n",
+            ))
+    
+    headers = {
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no",  # Disable nginx buffering
+    }
+    body = event_generator()
+    
+    # Opt-in: base64 audio only shrinks by about a quarter, which rarely pays
+    # for the CPU; compress per event so streaming is kept
+    if settings.stream_gzip and accept_encoding and "gzip" in accept_encoding.lower():
+        body = _gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
     
     return StreamingResponse(
-        event_generator(),
+        body,
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",  # Disable nginx buffering
-        }
+        headers=headers,
     )
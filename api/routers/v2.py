@@ -3,35 +3,46 @@ V2 API routes for Podcast TTS functionality.
 
 These endpoints use the {success, data, error} response format.
 """
+import io
 import uuid
 import os
+import asyncio
 import logging
-import numpy as np
+from operator import attrgetter
 from typing import Optional, List
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Header, HTTPException, Query, Response
 
 from ..config import settings
 from ..models.schemas import (
     V2VoiceInfo,
-    V2VoiceListData,
     V2VoiceListResponse,
     V2ErrorResponse,
     PodcastGenerateRequest,
     PodcastGenerateResponse,
     PodcastGenerateData,
+    PodcastJobData,
+    PodcastJobResponse,
     PodcastSegmentTimeline,
     VoiceUpdateRequest,
     V2VoiceUpdateResponse,
 )
 from ..services.voice_service import get_voice_service
 from ..services.tts_service import get_tts_service
+from ..services.response_cache import get_response_cache
+from ..services.podcast_jobs import get_podcast_jobs
 from ..utils.cleanup import get_audio_manager
+from ..utils.responses import AudioFileResponse, FastJSONResponse
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v2", tags=["v2-podcast"])
 
+# Voice sample URLs are "<prefix><voice_id>/sample"
+SAMPLE_AUDIO_URL_PREFIX = f"{router.prefix}/voices/"
+
+# Voice samples are immutable once uploaded
+SAMPLE_CACHE_CONTROL = "public, max-age=86400, immutable"
+
 
 def make_error_response(error: str) -> dict:
     """Create a standard v2 error response."""
@@ -61,24 +72,25 @@ async def get_voices(
         if for_podcast:
             voices = [v for v in voices if v.get("for_podcast", False)]
         
-        # Convert to V2 format
-        voice_list = []
-        for v in voices:
-            voice_id = v["voice_uuid"]
-            voice_list.append(V2VoiceInfo(
-                voice_id=voice_id,
-                voice_name=v["voice_name"],
-                description=v.get("description", ""),
-                suitable_for=v.get("suitable_for", []),
-                for_podcast=v.get("for_podcast", False),
-                sample_audio_url=f"/api/v2/voices/{voice_id}/sample",
-            ))
+        # Build the payload as plain dicts; returning a response directly
+        # skips constructing and re-validating the response models
+        voice_list = [
+            {
+                "voice_id": v["voice_uuid"],
+                "voice_name": v["voice_name"],
+                "description": v.get("description", ""),
+                "suitable_for": v.get("suitable_for", []),
+                "for_podcast": v.get("for_podcast", False),
+                "sample_audio_url": f"{SAMPLE_AUDIO_URL_PREFIX}{v['voice_uuid']}/sample",
+            }
+            for v in voices
+        ]
         
-        return V2VoiceListResponse(
-            success=True,
-            data=V2VoiceListData(voices=voice_list),
-            error=None,
-        )
+        return FastJSONResponse({
+            "success": True,
+            "data": {"voices": voice_list},
+            "error": None,
+        })
     
     except Exception as e:
         logger.error(f"Failed to get voices: {e}")
@@ -99,31 +111,56 @@ async def get_voices(
     summary="获取音色示例音频",
     description="返回音色的参考音频文件。"
 )
-async def get_voice_sample(voice_id: str):
+async def get_voice_sample(
+    voice_id: str,
+    if_none_match: Optional[str] = Header(None, include_in_schema=False),
+):
     """Get the sample audio file for a voice."""
-    voice_service = get_voice_service()
+    sample = get_voice_service().get_voice_sample(voice_id)
+    if sample is None:
+        raise HTTPException(
+            status_code=404,
+            detail=make_error_response(f"音色不存在: {voice_id}")
+        )
+    
+    audio_path, content_type, filename, etag = sample
+    
+    # Sample audio never changes after upload, so a stored content hash
+    # answers conditional requests without touching the file
+    if etag and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": SAMPLE_CACHE_CONTROL})
     
-    audio_path = voice_service.get_voice_audio_path(voice_id)
-    if not audio_path:
+    # The stat doubles as the existence check and is reused by the response
+    try:
+        stat_result = os.stat(audio_path)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=404,
             detail=make_error_response(f"音色不存在: {voice_id}")
         )
     
-    # Determine content type from file extension
-    ext = audio_path.suffix.lower()
-    content_type_map = {
-        ".wav": "audio/wav",
-        ".mp3": "audio/mpeg",
-        ".ogg": "audio/ogg",
-        ".flac": "audio/flac",
-    }
-    content_type = content_type_map.get(ext, "audio/wav")
+    if etag is None:
+        # Voices created before content hashes were stored
+        etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": SAMPLE_CACHE_CONTROL})
     
-    return FileResponse(
-        path=str(audio_path),
+    return AudioFileResponse(
+        path=audio_path,
         media_type=content_type,
-        filename=f"sample{ext}",
+        filename=filename,
+        stat_result=stat_result,
+        headers={"ETag": etag, "Cache-Control": SAMPLE_CACHE_CONTROL},
+    )
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header (weak comparison) against an ETag."""
+    if not if_none_match:
+        return False
+    return any(
+        tag.strip().removeprefix("W/") in (etag, "*")
+        for tag in if_none_match.split(",")
     )
 
 
@@ -147,6 +184,87 @@ async def generate_podcast(request: PodcastGenerateRequest):
     Each segment is generated independently, and the actual audio duration
     is used to calculate precise timeline information.
     """
+    return await run_podcast(request)
+
+
+@router.post(
+    "/tts/podcast/submit",
+    response_model=PodcastJobResponse,
+    status_code=202,
+    responses={
+        404: {"model": V2ErrorResponse, "description": "Voice not found"},
+        503: {"model": V2ErrorResponse, "description": "Job queue full"},
+    },
+    summary="提交 Podcast 生成任务",
+    description="异步生成 Podcast 音频：立即返回任务 ID 和状态查询链接，生成完成后通过状态接口获取带段落时间轴的结果。"
+)
+async def submit_podcast(request: PodcastGenerateRequest):
+    """Queue Podcast generation and return the job status URL."""
+    if not get_voice_service().voice_exists(request.voice_id):
+        raise HTTPException(
+            status_code=404,
+            detail=make_error_response(f"音色不存在: {request.voice_id}")
+        )
+    
+    try:
+        audio_id = await get_podcast_jobs().submit(request)
+    except asyncio.QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail=make_error_response("任务队列已满，请稍后重试")
+        )
+    
+    return PodcastJobResponse(
+        success=True,
+        data=PodcastJobData(
+            audio_id=audio_id,
+            status="pending",
+            status_url=f"{router.prefix}/tts/podcast/status/{audio_id}",
+        ),
+        error=None,
+    )
+
+
+@router.get(
+    "/tts/podcast/status/{audio_id}",
+    response_model=PodcastJobResponse,
+    responses={
+        404: {"model": V2ErrorResponse, "description": "Job not found or expired"},
+    },
+    summary="查询 Podcast 生成任务",
+    description="查询异步 Podcast 任务状态（pending/running/done/failed），完成后返回生成结果。"
+)
+async def get_podcast_status(audio_id: str):
+    """Get the status and result of a queued Podcast job."""
+    job = await get_podcast_jobs().get_status(audio_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=make_error_response(f"任务不存在: {audio_id}")
+        )
+    
+    return PodcastJobResponse(
+        success=True,
+        data=PodcastJobData(
+            audio_id=audio_id,
+            status_url=f"{router.prefix}/tts/podcast/status/{audio_id}",
+            **job,
+        ),
+        error=None,
+    )
+
+
+async def run_podcast(request: PodcastGenerateRequest, audio_id: Optional[str] = None) -> PodcastGenerateResponse:
+    """
+    Generate a podcast (shared by the synchronous endpoint and the job queue).
+    
+    Args:
+        request: Podcast generation request
+        audio_id: ID for the saved audio (generated if not given)
+        
+    Returns:
+        Podcast response; failures are reported with success=False
+    """
     try:
         # Validate voice exists
         voice_service = get_voice_service()
@@ -167,63 +285,133 @@ async def generate_podcast(request: PodcastGenerateRequest):
                 error="segments 不能为空",
             )
         
+        # Identical podcasts reuse the saved audio while it has not expired
+        cache = get_response_cache()
+        cache_key = cache.make_podcast_key(request, voice) if settings.response_cache_enabled else None
+        cached = await cache.get_podcast(cache_key) if cache_key else None
+        if cached is not None:
+            if audio_id and audio_id != cached["audio_id"]:
+                # Queued jobs report their own audio_id, so the saved audio
+                # has to be downloadable under it as well
+                hit = await asyncio.to_thread(get_audio_manager().link_audio, cached["audio_id"], audio_id)
+            else:
+                hit = get_audio_manager().get_audio_path(cached["audio_id"])
+            if hit:
+                logger.info(f"Podcast cache hit: {cached['audio_id']}")
+                data = PodcastGenerateData(**cached["data"])
+                if audio_id:
+                    data.audio_url = f"/downloads/{audio_id}"
+                return PodcastGenerateResponse(
+                    success=True,
+                    data=data,
+                    error=None,
+                )
+            await cache.invalidate_podcast(cache_key)
+        
         # Sort segments by index
-        sorted_segments = sorted(request.segments, key=lambda s: s.segment_index)
+        sorted_segments = sorted(request.segments, key=attrgetter("segment_index"))
         
         # Get TTS service and generate audio for each segment
         tts_service = get_tts_service()
         await tts_service._ensure_model_loaded()
         
-        all_audio_chunks: List[np.ndarray] = []
-        timeline_results: List[PodcastSegmentTimeline] = []
-        current_time_ms = 0
-        
-        prompt_wav_path = str(voice_service.get_voice_audio_path(request.voice_id))
+        # Resolve the voice once for all segments
+        resolved = voice_service.resolve_voice(request.voice_id)
+        if not resolved:
+            return PodcastGenerateResponse(
+                success=False,
+                data=None,
+                error=f"音色音频不存在: {request.voice_id}",
+            )
+        voice, prompt_wav_path = resolved
         prompt_text = voice["prompt_text"]
         
         logger.info(f"Generating podcast with {len(sorted_segments)} segments")
         
-        for seg in sorted_segments:
-            logger.info(f"Generating segment {seg.segment_index}: {seg.content[:50]}...")
-            
-            # Generate audio for this segment
+        if len(sorted_segments) == 1:
+            # Single segment: encode the audio directly, no encoder pipeline
+            # or timeline accumulation
+            seg = sorted_segments[0]
             audio, sample_rate, _ = await tts_service.generate(
                 text=seg.content,
-                voice_uuid=request.voice_id,
+                prompt_wav_path=prompt_wav_path,
+                prompt_text=prompt_text,
             )
+            current_time_ms = int(audio.shape[-1] / sample_rate * 1000)
+            timeline_results = [PodcastSegmentTimeline(
+                segment_index=seg.segment_index,
+                start_time_ms=0,
+                end_time_ms=current_time_ms,
+            )]
+            audio_bytes = await asyncio.to_thread(tts_service.audio_to_bytes, audio, request.output_format)
+            del audio
+        else:
+            # Synthesize all segments in one batch: the voice prompt is encoded
+            # once and the model runs them back-to-back in a single executor job.
+            # Each finished segment is handed to the encoder right away, so
+            # encoding overlaps with inference of the following segments.
+            loop = asyncio.get_running_loop()
+            pending: asyncio.Queue = asyncio.Queue()
+            buffer = io.BytesIO()
+            writer = tts_service.open_audio_writer(buffer, request.output_format)
             
-            # Calculate precise duration from actual audio samples
-            duration_samples = len(audio)
-            duration_ms = int(duration_samples / sample_rate * 1000)
+            async def encode_segments():
+                while (audio := await pending.get()) is not None:
+                    await asyncio.to_thread(writer.write, audio)
             
-            # Record timeline
-            timeline_results.append(PodcastSegmentTimeline(
-                segment_index=seg.segment_index,
-                start_time_ms=current_time_ms,
-                end_time_ms=current_time_ms + duration_ms,
-            ))
+            encoder = asyncio.create_task(encode_segments())
+            try:
+                try:
+                    batch = await tts_service.generate_batch(
+                        [seg.content for seg in sorted_segments],
+                        prompt_wav_path=prompt_wav_path,
+                        prompt_text=prompt_text,
+                        on_result=lambda _, result: loop.call_soon_threadsafe(pending.put_nowait, result[0]),
+                    )
+                except BaseException:
+                    # The output is discarded: drop queued writes and only wait
+                    # for the one in progress, keeping the generation error
+                    while not pending.empty():
+                        pending.get_nowait()
+                    pending.put_nowait(None)
+                    await asyncio.gather(encoder, return_exceptions=True)
+                    raise
+                
+                # Let queued writes finish before the header is finalized
+                pending.put_nowait(None)
+                await encoder
+            finally:
+                writer.close()
             
-            current_time_ms += duration_ms
-            all_audio_chunks.append(audio)
+            # Build the timeline from actual audio durations
+            timeline_results: List[PodcastSegmentTimeline] = []
+            current_time_ms = 0
             
-            logger.info(f"Segment {seg.segment_index} generated: {duration_ms}ms")
-        
-        # Concatenate all audio
-        if len(all_audio_chunks) > 1:
-            final_audio = np.concatenate(all_audio_chunks)
-        else:
-            final_audio = all_audio_chunks[0]
+            for seg, (audio, sample_rate, _) in zip(sorted_segments, batch):
+                duration_ms = int(audio.shape[-1] / sample_rate * 1000)
+                
+                timeline_results.append(PodcastSegmentTimeline(
+                    segment_index=seg.segment_index,
+                    start_time_ms=current_time_ms,
+                    end_time_ms=current_time_ms + duration_ms,
+                ))
+                
+                current_time_ms += duration_ms
+                logger.info(f"Segment {seg.segment_index} generated: {duration_ms}ms")
+            
+            del batch, audio
+            audio_bytes = buffer.getvalue()
         
         total_duration_ms = current_time_ms
         total_duration_seconds = total_duration_ms / 1000.0
         
         # Save audio file
-        audio_id = str(uuid.uuid4())
-        audio_bytes = tts_service.audio_to_bytes(final_audio, request.output_format)
+        audio_id = audio_id or str(uuid.uuid4())
         audio_file_size = len(audio_bytes)
         
         audio_manager = get_audio_manager()
-        meta = audio_manager.save_audio(
+        meta = await asyncio.to_thread(
+            audio_manager.save_audio,
             audio_id=audio_id,
             audio_data=audio_bytes,
             format=request.output_format,
@@ -235,15 +423,20 @@ async def generate_podcast(request: PodcastGenerateRequest):
         
         logger.info(f"Podcast generated: {total_duration_seconds:.2f}s, {audio_file_size} bytes")
         
+        data = PodcastGenerateData(
+            audio_url=audio_url,
+            audio_file_size=audio_file_size,
+            duration_seconds=round(total_duration_seconds, 3),
+            duration_ms=total_duration_ms,
+            segments=timeline_results,
+        )
+        
+        if cache_key:
+            await cache.set_podcast(cache_key, {"audio_id": audio_id, "data": data.model_dump()})
+        
         return PodcastGenerateResponse(
             success=True,
-            data=PodcastGenerateData(
-                audio_url=audio_url,
-                audio_file_size=audio_file_size,
-                duration_seconds=round(total_duration_seconds, 3),
-                duration_ms=total_duration_ms,
-                segments=timeline_results,
-            ),
+            data=data,
             error=None,
         )
     
@@ -255,8 +448,7 @@ async def generate_podcast(request: PodcastGenerateRequest):
             error=str(e),
         )
     except Exception as e:
-        import traceback
-        logger.error(f"Podcast generation failed: {traceback.format_exc()}")
+        logger.exception("Podcast generation failed")
         return PodcastGenerateResponse(
             success=False,
             data=None,
@@ -285,15 +477,7 @@ async def update_voice(voice_id: str, request: VoiceUpdateRequest):
     try:
         voice_service = get_voice_service()
         
-        # Check if voice exists
-        if not voice_service.voice_exists(voice_id):
-            return V2VoiceUpdateResponse(
-                success=False,
-                data=None,
-                error=f"音色不存在: {voice_id}",
-            )
-        
-        # Update voice
+        # Update voice (None if it does not exist)
         updated = voice_service.update_voice(
             voice_uuid=voice_id,
             voice_name=request.voice_name,
@@ -302,23 +486,23 @@ async def update_voice(voice_id: str, request: VoiceUpdateRequest):
             for_podcast=request.for_podcast,
         )
         
-        if not updated:
+        if updated is None:
             return V2VoiceUpdateResponse(
                 success=False,
                 data=None,
-                error="更新失败",
+                error=f"音色不存在: {voice_id}",
             )
         
-        # Return updated voice info
+        # Return updated voice info (stored metadata needs no re-validation)
         return V2VoiceUpdateResponse(
             success=True,
-            data=V2VoiceInfo(
+            data=V2VoiceInfo.model_construct(
                 voice_id=updated["voice_uuid"],
                 voice_name=updated["voice_name"],
                 description=updated.get("description", ""),
                 suitable_for=updated.get("suitable_for", []),
                 for_podcast=updated.get("for_podcast", False),
-                sample_audio_url=f"/api/v2/voices/{voice_id}/sample",
+                sample_audio_url=f"{SAMPLE_AUDIO_URL_PREFIX}{voice_id}/sample",
             ),
             error=None,
         )
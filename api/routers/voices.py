@@ -1,12 +1,13 @@
 """
 Voice management API routes.
 """
-import tempfile
 import os
+import asyncio
 from datetime import datetime
 from typing import Optional
 from fastapi import APIRouter, File, Form, UploadFile, HTTPException, status
 
+from ..config import settings
 from ..models.schemas import (
     VoiceResponse,
     VoiceListResponse,
@@ -15,9 +16,48 @@ from ..models.schemas import (
 )
 from ..services.voice_service import get_voice_service
 from ..services.tts_service import get_tts_service
+from ..utils.responses import FastJSONResponse
 
 router = APIRouter(prefix="/voices", tags=["voices"])
 
+# Accepted reference audio uploads (by content type or extension)
+ALLOWED_AUDIO_TYPES = frozenset({"audio/wav", "audio/x-wav", "audio/mpeg", "audio/mp3", "audio/ogg", "audio/flac"})
+ALLOWED_AUDIO_EXTENSIONS = frozenset({".wav", ".mp3", ".ogg", ".flac", ".m4a"})
+
+# Formats stored as-is; anything else is stored as wav
+STORED_AUDIO_FORMATS = frozenset({"wav", "mp3", "ogg", "flac"})
+
+# Uploads are read in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+async def _read_upload(upload: UploadFile, max_bytes: int) -> bytearray:
+    """
+    Read an upload in chunks into one buffer, rejecting oversize files early.
+    
+    Args:
+        upload: Uploaded file
+        max_bytes: Maximum accepted size
+        
+    Returns:
+        File contents
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Audio file too large. Maximum size: {max_bytes} bytes"
+        )
+    
+    data = bytearray()
+    while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+        data += chunk
+        if len(data) > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Audio file too large. Maximum size: {max_bytes} bytes"
+            )
+    return data
+
 
 @router.post(
     "",
@@ -40,15 +80,13 @@ async def create_voice(
 ):
     """Create a new voice profile."""
     # Validate file type
-    allowed_types = ["audio/wav", "audio/x-wav", "audio/mpeg", "audio/mp3", "audio/ogg", "audio/flac"]
     content_type = audio_file.content_type or ""
     
     # Also check by extension
     filename = audio_file.filename or ""
-    allowed_extensions = [".wav", ".mp3", ".ogg", ".flac", ".m4a"]
     ext = os.path.splitext(filename)[1].lower()
     
-    if content_type not in allowed_types and ext not in allowed_extensions:
+    if content_type not in ALLOWED_AUDIO_TYPES and ext not in ALLOWED_AUDIO_EXTENSIONS:
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported audio format. Allowed: wav, mp3, ogg, flac"
@@ -56,32 +94,25 @@ async def create_voice(
     
     try:
         # Read audio data
-        audio_data = await audio_file.read()
+        audio_data = await _read_upload(audio_file, settings.max_voice_upload_mb * 1024 * 1024)
         
         if len(audio_data) == 0:
             raise HTTPException(status_code=400, detail="Empty audio file")
         
-        # If no prompt_text provided, use ASR
+        # If no prompt_text provided, use ASR (decoded in memory)
         final_prompt_text = prompt_text
         if not final_prompt_text:
-            # Save to temp file for ASR
-            temp_file = tempfile.NamedTemporaryFile(suffix=ext or '.wav', delete=False)
-            try:
-                temp_file.write(audio_data)
-                temp_file.close()
-                
-                tts_service = get_tts_service()
-                final_prompt_text = await tts_service.recognize_prompt_text(temp_file.name)
-            finally:
-                if os.path.exists(temp_file.name):
-                    os.unlink(temp_file.name)
+            tts_service = get_tts_service()
+            final_prompt_text = await tts_service.recognize_prompt_text_bytes(
+                audio_data, ext.lstrip('.') or 'wav'
+            )
         
         if not final_prompt_text:
             final_prompt_text = ""
         
         # Determine format from extension
         audio_format = ext.lstrip('.') if ext else 'wav'
-        if audio_format not in ['wav', 'mp3', 'ogg', 'flac']:
+        if audio_format not in STORED_AUDIO_FORMATS:
             audio_format = 'wav'
         
         # Parse suitable_for from comma-separated string
@@ -91,7 +122,8 @@ async def create_voice(
         
         # Create voice
         voice_service = get_voice_service()
-        metadata = voice_service.create_voice(
+        metadata = await asyncio.to_thread(
+            voice_service.create_voice,
             audio_data=audio_data,
             voice_name=voice_name,
             prompt_text=final_prompt_text,
@@ -128,18 +160,20 @@ async def list_voices():
     voice_service = get_voice_service()
     voices = voice_service.list_voices()
     
-    return VoiceListResponse(
-        voices=[
-            VoiceResponse(
-                voice_uuid=v["voice_uuid"],
-                voice_name=v["voice_name"],
-                prompt_text=v["prompt_text"],
-                created_at=datetime.fromisoformat(v["created_at"]),
-            )
+    # Stored created_at is already ISO 8601, so the payload is built from
+    # plain dicts without constructing and re-validating response models
+    return FastJSONResponse({
+        "voices": [
+            {
+                "voice_uuid": v["voice_uuid"],
+                "voice_name": v["voice_name"],
+                "prompt_text": v["prompt_text"],
+                "created_at": v["created_at"],
+            }
             for v in voices
         ],
-        total=len(voices),
-    )
+        "total": len(voices),
+    })
 
 
 @router.get(
@@ -183,15 +217,13 @@ async def delete_voice(voice_uuid: str):
     """Delete a voice profile."""
     voice_service = get_voice_service()
     
-    if not voice_service.voice_exists(voice_uuid):
+    if not voice_service.delete_voice(voice_uuid):
         raise HTTPException(
             status_code=404,
             detail=f"Voice not found: {voice_uuid}"
         )
     
-    success = voice_service.delete_voice(voice_uuid)
-    
     return VoiceDeleteResponse(
-        success=success,
-        message="Voice deleted successfully" if success else "Failed to delete voice"
+        success=True,
+        message="Voice deleted successfully"
     )
@@ -0,0 +1,387 @@
+"""
+Request batcher - coalesces concurrent TTS requests into batched service calls.
+"""
+import uuid
+import asyncio
+import logging
+from bisect import bisect_right
+from collections import deque
+from functools import partial
+from typing import Optional, List, Tuple, Dict, Deque, Set
+
+import numpy as np
+import orjson
+from pydantic import ValidationError
+
+from ..config import settings
+from ..models.schemas import TTSGenerateRequest
+from .tts_service import get_tts_service, InvalidAudioError
+from .redis_pool import get_redis, get_worker_redis, result_waiters, pack_result, unpack_result
+
+logger = logging.getLogger(__name__)
+
+
+class TTSBatcher:
+    """
+    Adaptive micro-batching scheduler in front of TTSService.
+    
+    Requests are queued together with a future. A single background worker
+    sorts incoming requests into length buckets (by text length in
+    characters) so that short and long texts are never mixed in one batch.
+    A bucket is flushed when it holds ``max_batch_size`` requests or when its
+    oldest request has waited ``max_wait_ms``, whichever comes first; a
+    request that arrives to an otherwise idle queue is flushed right away.
+    Flushed requests that share a voice and generation parameters are handed
+    to ``TTSService.generate_batch`` together, and each request is answered
+    as soon as its own text is generated.
+    
+    With ``queue_type = "redis"`` the queue lives in a Redis list shared by
+    all uvicorn workers: handlers LPUSH jobs to ``tts:queue`` and BLPOP their
+    result from ``tts:results:<job_id>``, while the batch worker (run only in
+    processes with ``batch_worker_enabled``) pops jobs from the shared list.
+    """
+    
+    # Upper bounds (exclusive) of the text length bands: <64, 64-256, 256-512, >=512
+    BUCKET_BOUNDS = (64, 256, 512)
+    
+    # Redis keys (queue_type = "redis")
+    QUEUE_KEY = "tts:queue"
+    RESULT_KEY = "tts:results:{}"
+    
+    def __init__(self, max_batch_size: int = None, max_wait_ms: int = None):
+        """
+        Initialize the batcher.
+        
+        Args:
+            max_batch_size: Maximum number of requests per batch
+            max_wait_ms: Maximum time a request waits for its batch to fill (milliseconds)
+        """
+        self.max_batch_size = max_batch_size or settings.batch_max_size
+        self.max_wait = (max_wait_ms or settings.batch_max_wait_ms) / 1000.0
+        
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.queue_max_size)
+        self._buckets: List[Deque[Tuple[float, TTSGenerateRequest, asyncio.Future]]] = [
+            deque() for _ in range(len(self.BUCKET_BOUNDS) + 1)
+        ]
+        self._worker_task: Optional[asyncio.Task] = None
+        self._use_redis = settings.queue_type == "redis"
+        
+        # Strong references to in-flight Redis result publishes
+        self._publish_tasks: Set[asyncio.Task] = set()
+    
+    def start(self) -> asyncio.Task:
+        """Start the background worker if it is not running."""
+        if self._worker_task is None or self._worker_task.done():
+            # asyncio queues bind to the loop that first waits on them, so a
+            # worker started on a new event loop needs a fresh queue
+            self._queue = asyncio.Queue(maxsize=settings.queue_max_size)
+            self._worker_task = asyncio.create_task(self._worker())
+        return self._worker_task
+    
+    async def stop(self):
+        """Stop the background worker and fail any pending requests."""
+        if self._worker_task:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+        
+        pending = [future for bucket in self._buckets for _, _, future in bucket]
+        for bucket in self._buckets:
+            bucket.clear()
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            pending.append(future)
+        
+        for future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("TTS batcher stopped"))
+        
+        # Let Redis jobs report the failure back to their waiting handlers
+        await asyncio.sleep(0)
+        if self._publish_tasks:
+            await asyncio.gather(*self._publish_tasks, return_exceptions=True)
+    
+    async def submit(self, request: TTSGenerateRequest) -> Tuple[np.ndarray, int, List[str]]:
+        """
+        Submit a request and wait for its result.
+        
+        Args:
+            request: TTS generation request
+        
+        Returns:
+            Tuple of (audio_array, sample_rate, segments)
+        """
+        if self._use_redis:
+            return await self._submit_redis(request)
+        
+        self.start()
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        return await future
+    
+    async def _submit_redis(self, request: TTSGenerateRequest) -> Tuple[np.ndarray, int, List[str]]:
+        """Push a job to the shared Redis queue and wait for its result."""
+        redis = get_redis()
+        job_id = uuid.uuid4().hex
+        
+        # Leave connections free for short commands while many requests wait
+        async with result_waiters():
+            await redis.lpush(self.QUEUE_KEY, orjson.dumps({"job_id": job_id, "request": request.model_dump()}))
+            reply = await redis.blpop(self.RESULT_KEY.format(job_id), timeout=settings.redis_result_timeout)
+        if reply is None:
+            raise TimeoutError(f"TTS job {job_id} timed out after {settings.redis_result_timeout}s")
+        
+        meta, audio = unpack_result(reply[1])
+        if "error" in meta:
+            if meta.get("error_type") == "ValueError":
+                raise ValueError(meta["error"])
+            if meta.get("error_type") == "InvalidAudioError":
+                raise InvalidAudioError(meta["error"])
+            raise RuntimeError(meta["error"])
+        
+        return audio, meta["sample_rate"], meta["segments"]
+    
+    def _redis_job(self, raw: bytes) -> Optional[Tuple[TTSGenerateRequest, asyncio.Future]]:
+        """
+        Turn a job popped from Redis into a local request/future pair.
+        
+        Jobs with an invalid request are failed right away, so their handler
+        gets an error instead of waiting for the result timeout.
+        
+        Returns:
+            Request/future pair, or None if the job was rejected
+        """
+        try:
+            job = orjson.loads(raw)
+            job_id = job["job_id"]
+        except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+            # Nobody to answer without a job ID
+            logger.error(f"Dropping malformed TTS job: {e!r}")
+            return None
+        
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(partial(self._on_redis_job_done, job_id))
+        try:
+            request = TTSGenerateRequest.model_validate(job.get("request"))
+        except ValidationError as e:
+            logger.error(f"Invalid TTS job {job_id}: {e}")
+            future.set_exception(RuntimeError(f"Invalid TTS job: {e}"))
+            return None
+        return request, future
+    
+    def _on_redis_job_done(self, job_id: str, future: asyncio.Future):
+        """Schedule publishing a finished Redis job's result."""
+        task = asyncio.get_running_loop().create_task(self._publish_result(job_id, future))
+        self._publish_tasks.add(task)
+        task.add_done_callback(self._publish_tasks.discard)
+    
+    async def _publish_result(self, job_id: str, future: asyncio.Future):
+        """Push a job result (or error) to its Redis result list."""
+        if future.cancelled():
+            payload = orjson.dumps({"error": "TTS job cancelled"})
+        elif future.exception() is not None:
+            e = future.exception()
+            payload = orjson.dumps({"error": str(e), "error_type": type(e).__name__})
+        else:
+            payload = pack_result(*future.result())
+        
+        key = self.RESULT_KEY.format(job_id)
+        try:
+            async with get_worker_redis().pipeline(transaction=False) as pipe:
+                pipe.lpush(key, payload)
+                # Drop results nobody is waiting for anymore
+                pipe.expire(key, settings.redis_result_timeout)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to publish TTS result {job_id}: {e}")
+    
+    async def _receive(self, timeout: Optional[float]):
+        """Wait up to ``timeout`` seconds (None = forever) for one request."""
+        loop = asyncio.get_running_loop()
+        
+        if self._use_redis:
+            # BRPOP treats 0 as "block forever", so never round a deadline down to it
+            reply = await get_worker_redis().brpop(self.QUEUE_KEY, timeout=0 if timeout is None else max(timeout, 0.01))
+            item = self._redis_job(reply[1]) if reply is not None else None
+            if item is not None:
+                self._enqueue(item, loop.time())
+            return
+        
+        # Not asyncio.wait_for: before Python 3.12 it can drop an item whose
+        # get completes just as the timeout fires, leaving its future unresolved
+        getter = asyncio.ensure_future(self._queue.get())
+        try:
+            await asyncio.wait({getter}, timeout=timeout)
+        finally:
+            if not getter.done():
+                getter.cancel()
+                # A get that completes before the cancellation lands keeps its item
+                await asyncio.wait({getter})
+            if not getter.cancelled():
+                self._enqueue(getter.result(), loop.time())
+    
+    async def _drain(self):
+        """Bucket whatever else has arrived without waiting."""
+        loop = asyncio.get_running_loop()
+        
+        if self._use_redis:
+            raws = await get_worker_redis().rpop(self.QUEUE_KEY, self.max_batch_size)
+            for raw in raws or []:
+                item = self._redis_job(raw)
+                if item is not None:
+                    self._enqueue(item, loop.time())
+            return
+        
+        while not self._queue.empty():
+            self._enqueue(self._queue.get_nowait(), loop.time())
+    
+    def _bucket_index(self, request: TTSGenerateRequest) -> int:
+        """Get the length bucket index for a request."""
+        return bisect_right(self.BUCKET_BOUNDS, len(request.text))
+    
+    def _enqueue(self, item: Tuple[TTSGenerateRequest, asyncio.Future], now: float):
+        """Move a queued request into its length bucket."""
+        request, future = item
+        self._buckets[self._bucket_index(request)].append((now, request, future))
+    
+    def _next_deadline(self) -> Optional[float]:
+        """Get the time at which the oldest bucketed request must be flushed."""
+        oldest = [bucket[0][0] for bucket in self._buckets if bucket]
+        if not oldest:
+            return None
+        return min(oldest) + self.max_wait
+    
+    def _pop_ready_batch(self, now: float, queue_idle: bool = False) -> List[Tuple[TTSGenerateRequest, asyncio.Future]]:
+        """
+        Pop a batch from the most urgent bucket that is full or timed out.
+        
+        Args:
+            now: Current event loop time
+            queue_idle: The queue was just drained, so a lone bucketed
+                request has nothing to wait for and is flushed at once
+        """
+        if queue_idle and sum(len(bucket) for bucket in self._buckets) == 1:
+            ready = [bucket for bucket in self._buckets if bucket]
+        else:
+            ready = [
+                bucket for bucket in self._buckets
+                if bucket and (len(bucket) >= self.max_batch_size or now - bucket[0][0] >= self.max_wait)
+            ]
+        if not ready:
+            return []
+        
+        bucket = min(ready, key=lambda b: b[0][0])
+        batch = []
+        while bucket and len(batch) < self.max_batch_size:
+            _, request, future = bucket.popleft()
+            batch.append((request, future))
+        return batch
+    
+    async def _worker(self):
+        """Sort requests into length buckets and flush them as batches."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            deadline = self._next_deadline()
+            timeout = None if deadline is None else deadline - loop.time()
+            queue_idle = False
+            try:
+                if timeout is None or timeout > 0:
+                    await self._receive(timeout)
+                await self._drain()
+                queue_idle = True
+            except Exception as e:
+                # Keep the worker alive across transient queue errors;
+                # already bucketed requests are still flushed below
+                logger.error(f"Batch queue error: {e}")
+                await asyncio.sleep(min(timeout or 1.0, 1.0))
+            
+            batch = self._pop_ready_batch(loop.time(), queue_idle)
+            while batch:
+                try:
+                    await self._run_batch(batch)
+                except Exception as e:
+                    logger.error(f"Batch processing error: {e}")
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                batch = self._pop_ready_batch(loop.time())
+    
+    @staticmethod
+    def _batch_key(request: TTSGenerateRequest) -> tuple:
+        """Key of requests that can share one generate_batch call."""
+        if request.temp_audio_base64:
+            # Temporary voices are never shared between requests
+            return ("temp", id(request))
+        return (
+            request.voice_uuid,
+            request.cfg_value,
+            request.inference_timesteps,
+            request.normalize,
+            request.denoise,
+        )
+    
+    async def _run_batch(self, batch: List[Tuple[TTSGenerateRequest, asyncio.Future]]):
+        """Group a batch by voice/parameters and generate each group."""
+        groups: Dict[tuple, List[Tuple[TTSGenerateRequest, asyncio.Future]]] = {}
+        for request, future in batch:
+            # Skip requests whose client has already gone away
+            if future.cancelled():
+                continue
+            groups.setdefault(self._batch_key(request), []).append((request, future))
+        
+        tts_service = get_tts_service()
+        loop = asyncio.get_running_loop()
+        
+        for items in groups.values():
+            first = items[0][0]
+            
+            logger.info(f"Running TTS batch of {len(items)} requests")
+            
+            def deliver(index: int, result: Tuple[np.ndarray, int, List[str]], items=items):
+                # Answer each request as soon as its text is done instead of
+                # holding it until the whole group has been generated
+                loop.call_soon_threadsafe(self._resolve, items[index][1], result)
+            
+            try:
+                results = await tts_service.generate_batch(
+                    texts=[request.text for request, _ in items],
+                    voice_uuid=first.voice_uuid,
+                    temp_audio_base64=first.temp_audio_base64,
+                    temp_prompt_text=first.temp_prompt_text,
+                    cfg_value=first.cfg_value,
+                    inference_timesteps=first.inference_timesteps,
+                    normalize=first.normalize,
+                    denoise=first.denoise,
+                    on_result=deliver,
+                )
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, future), result in zip(items, results):
+                self._resolve(future, result)
+    
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Tuple[np.ndarray, int, List[str]]):
+        """Set a request's result unless it was already answered or cancelled."""
+        if not future.done():
+            future.set_result(result)
+
+
+# Singleton instance
+_batcher: Optional[TTSBatcher] = None
+
+
+def get_batcher() -> TTSBatcher:
+    """Get the global TTS batcher instance."""
+    global _batcher
+    if _batcher is None:
+        _batcher = TTSBatcher()
+    return _batcher
@@ -0,0 +1,174 @@
+"""
+Podcast job queue - runs podcast generation in the background.
+"""
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Optional, Callable, Awaitable
+
+import orjson
+
+from ..config import settings
+from ..models.schemas import PodcastGenerateRequest, PodcastGenerateResponse
+from .redis_pool import get_redis, get_worker_redis
+
+logger = logging.getLogger(__name__)
+
+PodcastHandler = Callable[[PodcastGenerateRequest, str], Awaitable[PodcastGenerateResponse]]
+
+
+class PodcastJobQueue:
+    """
+    Queue of podcast generation jobs with pollable status.
+    
+    Submitting returns a job id right away; a background worker runs the
+    jobs one at a time (the model serializes inference anyway) and records
+    each job's status as ``pending`` -> ``running`` -> ``done`` / ``failed``
+    together with the response data or error.
+    
+    With ``queue_type = "memory"`` jobs and statuses live in this process.
+    With ``queue_type = "redis"`` jobs are pushed to ``tts:podcast:jobs`` and
+    statuses stored under ``tts:podcast:job:<id>``, so any uvicorn worker can
+    accept or report a job while the processes with ``batch_worker_enabled``
+    run them.
+    """
+    
+    QUEUE_KEY = "tts:podcast:jobs"
+    STATUS_KEY = "tts:podcast:job:{}"
+    MAX_JOBS = 1024
+    
+    def __init__(self):
+        """Initialize the job queue."""
+        self._use_redis = settings.queue_type == "redis"
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.queue_max_size)
+        self._jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self._worker_task: Optional[asyncio.Task] = None
+        
+        # Finished statuses are kept as long as the generated audio
+        self.status_ttl_seconds = settings.generated_audio_expire_hours * 3600
+    
+    def start(self, handler: PodcastHandler) -> asyncio.Task:
+        """
+        Start the background worker if it is not running.
+        
+        Args:
+            handler: Coroutine generating a podcast for (request, audio_id)
+        """
+        if self._worker_task is None or self._worker_task.done():
+            # asyncio queues bind to the loop that first waits on them
+            self._queue = asyncio.Queue(maxsize=settings.queue_max_size)
+            self._worker_task = asyncio.create_task(self._worker(handler))
+        return self._worker_task
+    
+    async def stop(self):
+        """Stop the background worker."""
+        if self._worker_task:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+    
+    async def submit(self, request: PodcastGenerateRequest) -> str:
+        """
+        Queue a podcast job.
+        
+        Args:
+            request: Podcast generation request
+        
+        Returns:
+            Job id, also used as the generated audio id
+        
+        Raises:
+            asyncio.QueueFull: If the memory queue is full
+        """
+        audio_id = str(uuid.uuid4())
+        
+        if self._use_redis:
+            await self._set_status(audio_id, "pending")
+            await get_redis().lpush(self.QUEUE_KEY, orjson.dumps({"audio_id": audio_id, "request": request.model_dump()}))
+            return audio_id
+        
+        self._queue.put_nowait((audio_id, request))
+        await self._set_status(audio_id, "pending")
+        return audio_id
+    
+    async def get_status(self, audio_id: str) -> Optional[dict]:
+        """
+        Get a job's status.
+        
+        Returns:
+            Dict with status, result and error, or None if the job is unknown
+        """
+        if self._use_redis:
+            payload = await get_redis().get(self.STATUS_KEY.format(audio_id))
+            return orjson.loads(payload) if payload is not None else None
+        
+        return self._jobs.get(audio_id)
+    
+    async def _set_status(self, audio_id: str, status: str, result: dict = None, error: str = None):
+        """Record a job's status."""
+        job = {"status": status, "result": result, "error": error}
+        
+        if self._use_redis:
+            await get_redis().set(self.STATUS_KEY.format(audio_id), orjson.dumps(job), ex=self.status_ttl_seconds)
+            return
+        
+        self._jobs[audio_id] = job
+        self._jobs.move_to_end(audio_id)
+        
+        # Forget the oldest finished jobs
+        if len(self._jobs) > self.MAX_JOBS:
+            for old_id in [k for k, v in self._jobs.items() if v["status"] in ("done", "failed")]:
+                if len(self._jobs) <= self.MAX_JOBS:
+                    break
+                del self._jobs[old_id]
+    
+    async def _receive(self):
+        """Wait for the next (audio_id, request) job."""
+        if self._use_redis:
+            _, raw = await get_worker_redis().brpop(self.QUEUE_KEY, timeout=0)
+            job = orjson.loads(raw)
+            return job["audio_id"], PodcastGenerateRequest.model_validate(job["request"])
+        
+        return await self._queue.get()
+    
+    async def _worker(self, handler: PodcastHandler):
+        """Run queued jobs one at a time."""
+        while True:
+            try:
+                audio_id, request = await self._receive()
+            except Exception as e:
+                logger.error(f"Podcast job queue error: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            
+            logger.info(f"Running podcast job {audio_id}")
+            
+            try:
+                await self._set_status(audio_id, "running")
+                response = await handler(request, audio_id)
+                if response.success:
+                    await self._set_status(audio_id, "done", result=response.data.model_dump())
+                else:
+                    await self._set_status(audio_id, "failed", error=response.error)
+            except Exception as e:
+                logger.exception(f"Podcast job {audio_id} failed")
+                try:
+                    await self._set_status(audio_id, "failed", error=f"生成失败: {str(e)}")
+                except Exception:
+                    pass
+
+
+# Singleton instance
+_podcast_jobs: Optional[PodcastJobQueue] = None
+
+
+def get_podcast_jobs() -> PodcastJobQueue:
+    """Get the global podcast job queue instance."""
+    global _podcast_jobs
+    if _podcast_jobs is None:
+        _podcast_jobs = PodcastJobQueue()
+    return _podcast_jobs
@@ -0,0 +1,133 @@
+"""
+Shared Redis connection pool (used when queue_type = "redis").
+"""
+import asyncio
+import logging
+from typing import List, Tuple
+
+import numpy as np
+import orjson
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bounds for the configured pool size
+MIN_POOL_SIZE = 2
+MAX_POOL_SIZE = 256
+
+# Seconds a command waits for a free connection before failing
+CONNECTION_TIMEOUT = 10
+
+# Connections for this process's queue workers (batch and podcast BRPOP,
+# result publishes), kept apart so waiting handlers can never starve them
+WORKER_POOL_SIZE = 8
+
+_pool = None
+_worker_pool = None
+_result_waiters = None
+
+
+def _pool_size() -> int:
+    """Get the clamped configured pool size."""
+    return max(MIN_POOL_SIZE, min(settings.redis_pool_size, MAX_POOL_SIZE))
+
+
+def _create_pool(max_connections: int, timeout):
+    """Create a connection pool that waits for a free connection instead of failing."""
+    import redis.asyncio as aioredis
+    
+    return aioredis.BlockingConnectionPool(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        db=settings.redis_db,
+        max_connections=max_connections,
+        timeout=timeout,
+    )
+
+
+def init_redis_pool():
+    """
+    Create the global connection pools if they do not exist.
+    
+    Returns:
+        redis.asyncio.BlockingConnectionPool used by request handlers
+    """
+    global _pool, _worker_pool
+    if _pool is None:
+        # Every waiting /tts/generate request holds a connection in BLPOP,
+        # so clamp the override instead of trusting arbitrary values
+        pool_size = _pool_size()
+        if pool_size != settings.redis_pool_size:
+            logger.warning(f"redis_pool_size={settings.redis_pool_size} out of range, using {pool_size}")
+        
+        _pool = _create_pool(pool_size, CONNECTION_TIMEOUT)
+        logger.info(f"Redis pool created: {settings.redis_host}:{settings.redis_port}/{settings.redis_db} (max {pool_size} connections)")
+    
+    if _worker_pool is None:
+        # Workers block in BRPOP indefinitely, so their publishes simply
+        # wait for a connection
+        _worker_pool = _create_pool(WORKER_POOL_SIZE, None)
+    return _pool
+
+
+def get_redis():
+    """
+    Get a Redis client bound to the request handler pool.
+    
+    Returns:
+        redis.asyncio.Redis
+    """
+    import redis.asyncio as aioredis
+    
+    return aioredis.Redis(connection_pool=init_redis_pool())
+
+
+def get_worker_redis():
+    """
+    Get a Redis client bound to the queue worker pool.
+    
+    Returns:
+        redis.asyncio.Redis
+    """
+    import redis.asyncio as aioredis
+    
+    init_redis_pool()
+    return aioredis.Redis(connection_pool=_worker_pool)
+
+
+def result_waiters() -> asyncio.Semaphore:
+    """
+    Get the semaphore bounding handlers blocked waiting for a result.
+    
+    Only three quarters of the handler pool may sit in BLPOP, so cache
+    lookups and job status commands always find a free connection.
+    """
+    global _result_waiters
+    if _result_waiters is None:
+        _result_waiters = asyncio.Semaphore(max(1, _pool_size() * 3 // 4))
+    return _result_waiters
+
+
+async def close_redis_pool():
+    """Disconnect all pooled connections."""
+    global _pool, _worker_pool, _result_waiters
+    for pool in (_pool, _worker_pool):
+        if pool is not None:
+            await pool.disconnect()
+    _pool = None
+    _worker_pool = None
+    # Semaphores bind to the event loop they are first awaited on
+    _result_waiters = None
+
+
+def pack_result(audio: np.ndarray, sample_rate: int, segments: List[str]) -> bytes:
+    """Serialize a generation result as a JSON header line followed by raw float32 samples."""
+    header = orjson.dumps({"sample_rate": sample_rate, "segments": segments})
+    return header + b"\n" + np.asarray(audio, dtype=np.float32).tobytes()
+
+
+def unpack_result(payload: bytes) -> Tuple[dict, np.ndarray]:
+    """Inverse of pack_result; returns (header, audio_array)."""
+    header, _, body = payload.partition(b"\n")
+    return orjson.loads(header), np.frombuffer(body, dtype=np.float32)
@@ -0,0 +1,205 @@
+"""
+Response cache - reuses generated audio for identical TTS requests.
+"""
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Optional, List, Tuple
+
+import numpy as np
+import orjson
+
+from ..config import settings
+from ..models.schemas import TTSGenerateRequest, PodcastGenerateRequest
+from .voice_service import get_voice_service
+from .redis_pool import get_redis, pack_result, unpack_result
+
+logger = logging.getLogger(__name__)
+
+CachedResult = Tuple[np.ndarray, int, List[str]]
+
+
+class ResponseCache:
+    """
+    Content-addressed cache of generated audio.
+    
+    Keys hash the text, the voice (including its creation time, so a
+    deleted-and-recreated voice never hits stale audio) and all generation
+    parameters. Requests with a temporary voice are never cached.
+    
+    Uses a byte-bounded in-process LRU for ``queue_type = "memory"`` and the
+    shared Redis pool (with TTL) for ``queue_type = "redis"``, so all uvicorn
+    workers see the same entries.
+    
+    Podcast results are cached separately as their response data (saved
+    audio id, size, duration and timeline); callers must check the saved
+    audio still exists before reusing an entry.
+    """
+    
+    KEY_PREFIX = "tts:cache:"
+    PODCAST_KEY_PREFIX = "tts:podcast:"
+    PODCAST_MAX_ENTRIES = 1024
+    
+    def __init__(self, max_mb: int = None, ttl_seconds: int = None):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_mb: Maximum total audio size held in memory (MB, memory backend)
+            ttl_seconds: Entry lifetime (seconds, Redis backend)
+        """
+        self.max_bytes = (max_mb or settings.response_cache_max_mb) * 1024 * 1024
+        self.ttl_seconds = ttl_seconds or settings.response_cache_ttl_seconds
+        self._use_redis = settings.queue_type == "redis"
+        
+        self._entries: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self._size = 0
+        
+        # Podcast entries live as long as their saved audio
+        self.podcast_ttl_seconds = settings.generated_audio_expire_hours * 3600
+        self._podcast_entries: "OrderedDict[str, dict]" = OrderedDict()
+    
+    def make_key(self, request: TTSGenerateRequest) -> Optional[str]:
+        """
+        Build the cache key for a request.
+        
+        Returns:
+            Hex digest, or None if the request must not be cached
+        """
+        if request.temp_audio_base64:
+            return None
+        
+        voice_version = None
+        if request.voice_uuid:
+            voice = get_voice_service().get_voice(request.voice_uuid)
+            if voice is None:
+                # Let generation report the missing voice
+                return None
+            voice_version = voice.get("created_at")
+        
+        key_data = orjson.dumps([
+            request.text,
+            request.voice_uuid,
+            voice_version,
+            request.cfg_value or settings.default_cfg_value,
+            request.inference_timesteps or settings.default_inference_timesteps,
+            request.normalize,
+            request.denoise,
+        ])
+        return hashlib.blake2b(key_data, digest_size=16).hexdigest()
+    
+    async def get(self, key: str) -> Optional[CachedResult]:
+        """Get a cached (audio, sample_rate, segments) result."""
+        if self._use_redis:
+            try:
+                payload = await get_redis().get(self.KEY_PREFIX + key)
+            except Exception as e:
+                logger.warning(f"Response cache read failed: {e}")
+                return None
+            if payload is None:
+                return None
+            header, audio = unpack_result(payload)
+            return audio, header["sample_rate"], header["segments"]
+        
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+        return result
+    
+    async def set(self, key: str, result: CachedResult):
+        """Store a generation result."""
+        audio, sample_rate, segments = result
+        
+        if self._use_redis:
+            try:
+                payload = await asyncio.to_thread(pack_result, audio, sample_rate, segments)
+                await get_redis().set(self.KEY_PREFIX + key, payload, ex=self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Response cache write failed: {e}")
+            return
+        
+        if audio.nbytes > self.max_bytes or key in self._entries:
+            return
+        
+        # Entries are shared between requests
+        audio.setflags(write=False)
+        self._entries[key] = result
+        self._size += audio.nbytes
+        
+        # Evict least recently used entries
+        while self._size > self.max_bytes:
+            _, (old_audio, _, _) = self._entries.popitem(last=False)
+            self._size -= old_audio.nbytes
+    
+    
+    def make_podcast_key(self, request: PodcastGenerateRequest, voice: dict) -> str:
+        """
+        Build the cache key for a podcast request.
+        
+        Args:
+            request: Podcast request
+            voice: Metadata of the request's voice
+        
+        Returns:
+            Hex digest
+        """
+        key_data = orjson.dumps([
+            request.voice_id,
+            voice.get("created_at"),
+            request.output_format,
+            sorted((seg.segment_index, seg.content) for seg in request.segments),
+        ])
+        return hashlib.blake2b(key_data, digest_size=16).hexdigest()
+    
+    async def get_podcast(self, key: str) -> Optional[dict]:
+        """Get cached podcast response data."""
+        if self._use_redis:
+            try:
+                payload = await get_redis().get(self.PODCAST_KEY_PREFIX + key)
+            except Exception as e:
+                logger.warning(f"Podcast cache read failed: {e}")
+                return None
+            return orjson.loads(payload) if payload is not None else None
+        
+        data = self._podcast_entries.get(key)
+        if data is not None:
+            self._podcast_entries.move_to_end(key)
+        return data
+    
+    async def set_podcast(self, key: str, data: dict):
+        """Store podcast response data."""
+        if self._use_redis:
+            try:
+                await get_redis().set(self.PODCAST_KEY_PREFIX + key, orjson.dumps(data), ex=self.podcast_ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Podcast cache write failed: {e}")
+            return
+        
+        self._podcast_entries[key] = data
+        self._podcast_entries.move_to_end(key)
+        while len(self._podcast_entries) > self.PODCAST_MAX_ENTRIES:
+            self._podcast_entries.popitem(last=False)
+    
+    async def invalidate_podcast(self, key: str):
+        """Drop a podcast entry whose saved audio is gone."""
+        if self._use_redis:
+            try:
+                await get_redis().delete(self.PODCAST_KEY_PREFIX + key)
+            except Exception as e:
+                logger.warning(f"Podcast cache delete failed: {e}")
+            return
+        
+        self._podcast_entries.pop(key, None)
+
+
+# Singleton instance
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the global response cache instance."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
@@ -7,28 +7,47 @@ import sys
 import io
 import uuid
 import base64
+import binascii
+import struct
 import tempfile
 import asyncio
+import threading
 import numpy as np
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
-from typing import Optional, List, Tuple, AsyncGenerator, Dict, Any
+from functools import partial
+from typing import Optional, List, Tuple, AsyncGenerator, Dict, Any, Iterator, Callable, Union
 from pathlib import Path
 import logging
 import soundfile as sf
 
+# SIMD-accelerated base64 decoding when available
+try:
+    import pybase64 as _b64
+except ImportError:
+    _b64 = base64
+
 from ..config import settings
 from ..utils.text_splitter import smart_split
+from ..utils.pcm import float_to_pcm16, warmup as warmup_pcm
 from .voice_service import get_voice_service
 
 logger = logging.getLogger(__name__)
 
+class InvalidAudioError(Exception):
+    """Temporary voice audio sent by the client cannot be used (HTTP 400)."""
+
+
+# Sample rate expected by the ASR model for raw waveform input
+ASR_SAMPLE_RATE = 16000
+
 
 class TTSService:
     """
     TTS Service that wraps VoxCPM model and provides async interface.
     
     Features:
-    - Lazy model loading
+    - Model loading at startup or on first use
     - Async-friendly inference via thread pool
     - Automatic text splitting for long inputs
     - Support for both stored and temporary voice profiles
@@ -39,9 +58,33 @@ class TTSService:
         """Initialize TTS service (model loaded lazily)."""
         self._model = None
         self._asr_model = None
+        # Separate locks so a slow ASR load never blocks TTS requests
         self._model_lock = asyncio.Lock()
-        self._executor = ThreadPoolExecutor(max_workers=settings.worker_count)
+        self._asr_lock = asyncio.Lock()
+        # The GPU runs one generate at a time, so model work gets a single
+        # thread; batched ASR calls get their own thread, and audio encoding
+        # and decoding use a small separate pool (at least two threads) so
+        # neither queues behind inference or ASR
+        self._inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="voxcpm-infer")
+        self._asr_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="voxcpm-asr")
+        self._io_executor = ThreadPoolExecutor(
+            max_workers=max(2, min(4, settings.worker_count)), thread_name_prefix="voxcpm-io"
+        )
+        # VoxCPM decodes with a static batch-1 KV cache held on the model, so
+        # generate calls must never overlap
+        self._inference_lock = threading.Lock()
         self._sample_rate: Optional[int] = None
+        
+        # Encoded prompts of stored voices, reused across segments and requests
+        self._prompt_caches: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._prompt_cache_lock = threading.Lock()
+        
+        # ASR inputs waiting to be recognized together in one batch
+        self._asr_pending: List[Tuple[Any, asyncio.Future]] = []
+        self._asr_flush_handle: Optional[asyncio.TimerHandle] = None
+        
+        # Per-thread scratch buffer for base64 WAV encoding
+        self._encode_local = threading.local()
     
     @property
     def sample_rate(self) -> int:
@@ -50,6 +93,24 @@ class TTSService:
             raise RuntimeError("Model not loaded yet")
         return self._sample_rate
     
+    async def startup(self, load_asr: bool = False):
+        """
+        Load models ahead of the first request.
+        
+        Args:
+            load_asr: Also load the ASR model (in parallel, on the ASR thread)
+        """
+        async def preload(ensure_loaded, name: str):
+            try:
+                await ensure_loaded()
+            except Exception:
+                logger.exception(f"Failed to pre-load {name} model, retrying on the first request")
+        
+        loads = [preload(self._ensure_model_loaded, "VoxCPM")]
+        if load_asr:
+            loads.append(preload(self._ensure_asr_loaded, "ASR"))
+        await asyncio.gather(*loads)
+    
     async def _ensure_model_loaded(self):
         """Ensure model is loaded (lazy loading)."""
         if self._model is not None:
@@ -82,16 +143,19 @@ class TTSService:
                     )
             
             loop = asyncio.get_event_loop()
-            self._model = await loop.run_in_executor(self._executor, load_model)
+            self._model = await loop.run_in_executor(self._inference_executor, load_model)
             self._sample_rate = self._model.tts_model.sample_rate
             logger.info(f"VoxCPM model loaded. Sample rate: {self._sample_rate}")
+            
+            # Compile the PCM kernel now rather than in the first response
+            await loop.run_in_executor(self._io_executor, warmup_pcm)
     
     async def _ensure_asr_loaded(self):
         """Ensure ASR model is loaded for prompt text recognition."""
         if self._asr_model is not None:
             return
         
-        async with self._model_lock:
+        async with self._asr_lock:
             if self._asr_model is not None:
                 return
             
@@ -109,7 +173,8 @@ class TTSService:
                 )
             
             loop = asyncio.get_event_loop()
-            self._asr_model = await loop.run_in_executor(self._executor, load_asr)
+            # On the ASR thread, so the download never holds up audio encoding
+            self._asr_model = await loop.run_in_executor(self._asr_executor, load_asr)
             logger.info("ASR model loaded.")
     
     async def recognize_prompt_text(self, audio_path: str) -> str:
@@ -118,19 +183,315 @@ class TTSService:
         
         Args:
             audio_path: Path to audio file
-            
+        
         Returns:
             Recognized text
         """
+        return await self._recognize(audio_path)
+    
+    async def recognize_prompt_text_bytes(self, audio_bytes: bytes, fmt: str = "wav") -> str:
+        """
+        Recognize text from in-memory prompt audio using ASR.
+        
+        The audio is decoded in memory; containers libsndfile cannot read
+        (e.g. m4a) fall back to a temporary file on tmpfs.
+        
+        Args:
+            audio_bytes: Encoded audio file contents
+            fmt: Audio file extension (without dot)
+        
+        Returns:
+            Recognized text
+        """
+        def decode():
+            try:
+                wav, sr = sf.read(io.BytesIO(audio_bytes), dtype="float32", always_2d=True)
+            except Exception:
+                return None, self._write_tmpfs(audio_bytes, fmt)
+            
+            wav = wav.mean(axis=1)
+            if sr != ASR_SAMPLE_RATE:
+                import librosa
+                wav = librosa.resample(wav, orig_sr=sr, target_sr=ASR_SAMPLE_RATE)
+            return wav, None
+        
+        loop = asyncio.get_running_loop()
+        wav, temp_path = await loop.run_in_executor(self._io_executor, decode)
+        try:
+            return await self._recognize(wav if temp_path is None else temp_path)
+        finally:
+            self._remove_temp_file(temp_path)
+    
+    async def _recognize(self, audio_input) -> str:
+        """
+        Recognize one file path or 16 kHz mono waveform.
+        
+        Inputs arriving within ``asr_batch_wait_ms`` of each other are run
+        through the ASR model in one batched call.
+        """
         await self._ensure_asr_loaded()
         
-        def do_asr():
-            res = self._asr_model.generate(input=audio_path, language="auto", use_itn=True)
-            text = res[0]["text"].split('|>')[-1]
-            return text
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._asr_pending.append((audio_input, future))
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self._executor, do_asr)
+        if len(self._asr_pending) >= settings.asr_batch_max_size:
+            self._flush_asr()
+        elif self._asr_flush_handle is None:
+            self._asr_flush_handle = loop.call_later(settings.asr_batch_wait_ms / 1000.0, self._flush_asr)
+        
+        return await future
+    
+    def _flush_asr(self):
+        """Send the pending ASR inputs to the executor as one batch."""
+        if self._asr_flush_handle is not None:
+            self._asr_flush_handle.cancel()
+            self._asr_flush_handle = None
+        
+        batch, self._asr_pending = self._asr_pending, []
+        if not batch:
+            return
+        
+        inputs = [audio_input for audio_input, _ in batch]
+        futures = [future for _, future in batch]
+        
+        def resolve(done: asyncio.Future):
+            if done.cancelled():
+                results = [asyncio.CancelledError()] * len(futures)
+            elif done.exception() is not None:
+                results = [done.exception()] * len(futures)
+            else:
+                results = done.result()
+            
+            for future, result in zip(futures, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        
+        loop = asyncio.get_running_loop()
+        loop.run_in_executor(self._asr_executor, self._run_asr_batch, inputs).add_done_callback(resolve)
+    
+    def _run_asr_batch(self, inputs: list) -> list:
+        """
+        Run ASR on several inputs in one model call.
+        
+        If the batched call fails, the inputs are retried one at a time so a
+        bad file only fails its own request.
+        
+        Returns:
+            Text (or the exception raised) for each input
+        """
+        if len(inputs) > 1:
+            try:
+                res = self._asr_model.generate(
+                    input=inputs, language="auto", use_itn=True, batch_size=len(inputs)
+                )
+                if len(res) == len(inputs):
+                    return [r["text"].split('|>')[-1] for r in res]
+                logger.warning(f"Batched ASR returned {len(res)} results for {len(inputs)} inputs, retrying one by one")
+            except Exception as e:
+                logger.warning(f"Batched ASR failed, retrying one by one: {e}")
+        
+        results = []
+        for audio_input in inputs:
+            try:
+                results.append(self._run_asr(audio_input))
+            except Exception as e:
+                results.append(e)
+        return results
+    
+    def _run_asr(self, audio_input) -> str:
+        """Run ASR on a file path or a 16 kHz mono waveform."""
+        res = self._asr_model.generate(input=audio_input, language="auto", use_itn=True)
+        return res[0]["text"].split('|>')[-1]
+    
+    def _write_tmpfs(self, audio_bytes: bytes, fmt: str) -> str:
+        """Write audio bytes to a temporary file (tmpfs when available) for ASR."""
+        temp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        with tempfile.NamedTemporaryFile(suffix=f".{fmt}", dir=temp_dir, delete=False) as temp_file:
+            temp_file.write(audio_bytes)
+        return temp_file.name
+    
+    async def _resolve_prompt(
+        self,
+        voice_uuid: Optional[str] = None,
+        temp_audio_base64: Optional[str] = None,
+        temp_prompt_text: Optional[str] = None,
+        temp_audio_path: Optional[str] = None,
+        prompt_wav_path: Optional[str] = None,
+        prompt_text: Optional[str] = None,
+    ) -> Tuple[Union[str, bytes, None], Optional[str]]:
+        """
+        Resolve the prompt audio and prompt text for a request.
+        
+        Args:
+            voice_uuid: UUID of stored voice profile
+            temp_audio_base64: Base64 encoded temporary audio
+            temp_prompt_text: Text for temporary audio
+            temp_audio_path: Temporary audio already on disk (owned by the caller)
+            prompt_wav_path: Already resolved prompt audio path (skips the voice lookup)
+            prompt_text: Text of ``prompt_wav_path``
+        
+        Returns:
+            Tuple of (prompt audio, prompt_text). The prompt audio is a file
+            path, or the audio file contents for base64 temporary voices
+            (kept in memory, never written to disk).
+        """
+        if prompt_wav_path:
+            # Caller already resolved the voice (e.g. once per podcast)
+            return prompt_wav_path, prompt_text
+        
+        if voice_uuid:
+            # Use stored voice
+            resolved = get_voice_service().resolve_voice(voice_uuid)
+            if not resolved:
+                raise ValueError(f"Voice not found: {voice_uuid}")
+            
+            voice, prompt_wav_path = resolved
+            return prompt_wav_path, voice["prompt_text"]
+        
+        if temp_audio_path:
+            # Use temporary voice uploaded as a file
+            prompt_text = temp_prompt_text or await self.recognize_prompt_text(temp_audio_path)
+            return temp_audio_path, prompt_text
+        
+        if temp_audio_base64:
+            # Use temporary voice, decoded in memory
+            loop = asyncio.get_running_loop()
+            audio_bytes = await loop.run_in_executor(self._io_executor, _decode_base64_audio, temp_audio_base64)
+            
+            # Get prompt text (auto ASR if not provided)
+            prompt_text = temp_prompt_text or await self.recognize_prompt_text_bytes(audio_bytes)
+            return audio_bytes, prompt_text
+        
+        return None, None
+    
+    def _get_prompt_cache(self, prompt_wav_path: str, prompt_text: str, denoise: bool) -> dict:
+        """
+        Get the encoded prompt for a stored voice, encoding it on first use.
+        
+        Runs in the executor. Entries are keyed by file path and mtime, so a
+        replaced audio file is re-encoded.
+        
+        Args:
+            prompt_wav_path: Prompt audio path
+            prompt_text: Prompt audio text
+            denoise: Whether the prompt audio is denoised
+        
+        Returns:
+            Prompt cache for ``VoxCPM.generate(prompt_cache=...)``
+        """
+        key = (prompt_wav_path, os.stat(prompt_wav_path).st_mtime_ns, prompt_text, denoise)
+        
+        with self._prompt_cache_lock:
+            prompt_cache = self._prompt_caches.get(key)
+            if prompt_cache is not None:
+                self._prompt_caches.move_to_end(key)
+                return prompt_cache
+        
+        with self._inference_lock:
+            prompt_cache = self._model.build_prompt_cache(prompt_wav_path, prompt_text, denoise=denoise)
+        
+        with self._prompt_cache_lock:
+            self._prompt_caches[key] = prompt_cache
+            while len(self._prompt_caches) > settings.prompt_cache_max_voices:
+                self._prompt_caches.popitem(last=False)
+        return prompt_cache
+    
+    def _segment_generator(
+        self,
+        prompt_audio: Union[str, bytes, None],
+        prompt_text: Optional[str],
+        reuse_prompt: bool,
+        cfg: float,
+        steps: int,
+        normalize: bool,
+        denoise: bool,
+    ) -> Callable[[str], np.ndarray]:
+        """
+        Bind the per-request generation arguments once.
+        
+        The prompt is encoded once here and reused for every segment: stored
+        voices keep it in the prompt cache across requests, temporary voices
+        only for this request. Runs in the executor.
+        
+        Args:
+            prompt_audio: Prompt audio path, or audio file contents
+            prompt_text: Prompt audio text
+            reuse_prompt: Whether to keep the encoded prompt across requests (stored voices)
+            cfg: CFG guidance value
+            steps: Number of inference steps
+            normalize: Whether to normalize text
+            denoise: Whether to denoise prompt audio
+        
+        Returns:
+            Function generating one text segment
+        """
+        prompt_cache = None
+        if reuse_prompt:
+            prompt_cache = self._get_prompt_cache(prompt_audio, prompt_text, denoise)
+        elif prompt_audio is not None:
+            # generate() would encode a path on every call; in-memory audio
+            # is read straight from the buffer
+            if isinstance(prompt_audio, (bytes, bytearray)):
+                prompt_audio = io.BytesIO(prompt_audio)
+            with self._inference_lock:
+                prompt_cache = self._model.build_prompt_cache(prompt_audio, prompt_text, denoise=denoise)
+        generate = partial(
+            self._model.generate,
+            prompt_cache=prompt_cache,
+            cfg_value=cfg,
+            inference_timesteps=steps,
+            normalize=normalize,
+            denoise=denoise,
+        )
+        
+        def generate_segment(segment: str) -> np.ndarray:
+            try:
+                with self._inference_lock:
+                    return generate(text=segment)
+            except Exception:
+                logger.exception("Model generate error")
+                raise
+        
+        return generate_segment
+    
+    async def _split_texts(self, texts: List[str]) -> List[List[str]]:
+        """
+        Split texts into segments.
+        
+        Texts long enough to need splitting are split on the I/O executor so
+        a long request doesn't block the event loop; short ones are split
+        inline, where a thread hop would cost more than the work.
+        
+        Args:
+            texts: Texts to split
+        
+        Returns:
+            Segments of each text
+        """
+        max_length = settings.split_max_length
+        
+        def split_all():
+            return [smart_split(text, max_length=max_length) for text in texts]
+        
+        if sum(len(text) for text in texts) <= max_length:
+            return split_all()
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_executor, split_all)
+    
+    @staticmethod
+    def _remove_temp_file(path: Optional[str]):
+        """Remove a temporary prompt audio file, ignoring errors."""
+        if path and os.path.exists(path):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
     
     async def generate(
         self,
@@ -142,6 +503,9 @@ class TTSService:
         inference_timesteps: Optional[int] = None,
         normalize: bool = False,
         denoise: bool = False,
+        temp_audio_path: Optional[str] = None,
+        prompt_wav_path: Optional[str] = None,
+        prompt_text: Optional[str] = None,
     ) -> Tuple[np.ndarray, int, List[str]]:
         """
         Generate speech from text.
@@ -155,10 +519,69 @@ class TTSService:
             inference_timesteps: Number of inference steps
             normalize: Whether to normalize text
             denoise: Whether to denoise prompt audio
-            
+            temp_audio_path: Temporary audio file on disk (alternative to temp_audio_base64)
+            prompt_wav_path: Already resolved prompt audio path (alternative to voice_uuid)
+            prompt_text: Text of ``prompt_wav_path``
+        
         Returns:
             Tuple of (audio_array, sample_rate, segments)
         """
+        results = await self.generate_batch(
+            texts=[text],
+            voice_uuid=voice_uuid,
+            temp_audio_base64=temp_audio_base64,
+            temp_prompt_text=temp_prompt_text,
+            cfg_value=cfg_value,
+            inference_timesteps=inference_timesteps,
+            normalize=normalize,
+            denoise=denoise,
+            temp_audio_path=temp_audio_path,
+            prompt_wav_path=prompt_wav_path,
+            prompt_text=prompt_text,
+        )
+        return results[0]
+    
+    async def generate_batch(
+        self,
+        texts: List[str],
+        voice_uuid: Optional[str] = None,
+        temp_audio_base64: Optional[str] = None,
+        temp_prompt_text: Optional[str] = None,
+        cfg_value: Optional[float] = None,
+        inference_timesteps: Optional[int] = None,
+        normalize: bool = False,
+        denoise: bool = False,
+        temp_audio_path: Optional[str] = None,
+        prompt_wav_path: Optional[str] = None,
+        prompt_text: Optional[str] = None,
+        on_result: Optional[Callable[[int, Tuple[np.ndarray, int, List[str]]], None]] = None,
+    ) -> List[Tuple[np.ndarray, int, List[str]]]:
+        """
+        Generate speech for several texts that share one voice and parameters.
+        
+        The voice profile is resolved once, and the segments of all texts are
+        synthesized in a single executor job so the model runs back-to-back
+        without a round trip through the event loop between texts.
+        
+        Args:
+            texts: Texts to synthesize
+            voice_uuid: UUID of stored voice profile
+            temp_audio_base64: Base64 encoded temporary audio
+            temp_prompt_text: Text for temporary audio
+            cfg_value: CFG guidance value
+            inference_timesteps: Number of inference steps
+            normalize: Whether to normalize text
+            denoise: Whether to denoise prompt audio
+            temp_audio_path: Temporary audio file on disk (alternative to temp_audio_base64)
+            prompt_wav_path: Already resolved prompt audio path (alternative to voice_uuid)
+            prompt_text: Text of ``prompt_wav_path``
+            on_result: Called from the executor thread with (index, result) as
+                soon as each text is generated, e.g. to start encoding early or
+                answer its request; result is the same tuple as returned below
+        
+        Returns:
+            List of (audio_array, sample_rate, segments) tuples, one per text
+        """
         await self._ensure_model_loaded()
         
         # Resolve parameters
@@ -166,86 +589,51 @@ class TTSService:
         steps = inference_timesteps or settings.default_inference_timesteps
         
         # Resolve voice profile
-        prompt_wav_path = None
-        prompt_text = None
-        temp_file = None
+        prompt_audio, prompt_text = await self._resolve_prompt(
+            voice_uuid=voice_uuid,
+            temp_audio_base64=temp_audio_base64,
+            temp_prompt_text=temp_prompt_text,
+            temp_audio_path=temp_audio_path,
+            prompt_wav_path=prompt_wav_path,
+            prompt_text=prompt_text,
+        )
         
-        try:
-            if voice_uuid:
-                # Use stored voice
-                voice_service = get_voice_service()
-                voice = voice_service.get_voice(voice_uuid)
-                if not voice:
-                    raise ValueError(f"Voice not found: {voice_uuid}")
-                
-                prompt_wav_path = str(voice_service.get_voice_audio_path(voice_uuid))
-                prompt_text = voice["prompt_text"]
-                
-            elif temp_audio_base64:
-                # Use temporary voice
-                audio_bytes = base64.b64decode(temp_audio_base64)
-                temp_file = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-                temp_file.write(audio_bytes)
-                temp_file.close()
-                prompt_wav_path = temp_file.name
-                
-                # Get prompt text (auto ASR if not provided)
-                if temp_prompt_text:
-                    prompt_text = temp_prompt_text
-                else:
-                    prompt_text = await self.recognize_prompt_text(prompt_wav_path)
-            
-            # Split text into segments
-            segments = smart_split(text, max_length=settings.split_max_length)
-            logger.info(f"Text split into {len(segments)} segments")
-            
-            # Generate audio for each segment (serially)
-            all_audio = []
-            
-            for i, segment in enumerate(segments):
-                logger.info(f"Generating segment {i+1}/{len(segments)}: {segment[:50]}...")
-                
-                # Capture variables for closure
-                _segment = segment
-                _prompt_wav_path = prompt_wav_path
-                _prompt_text = prompt_text
-                _cfg = cfg
-                _steps = steps
-                _normalize = normalize
-                _denoise = denoise
-                
-                def generate_segment():
-                    try:
-                        return self._model.generate(
-                            text=_segment,
-                            prompt_wav_path=_prompt_wav_path,
-                            prompt_text=_prompt_text,
-                            cfg_value=_cfg,
-                            inference_timesteps=_steps,
-                            normalize=_normalize,
-                            denoise=_denoise,
-                        )
-                    except Exception as e:
-                        import traceback
-                        logger.error(f"Model generate error: {traceback.format_exc()}")
-                        raise
-                
-                loop = asyncio.get_event_loop()
-                wav = await loop.run_in_executor(self._executor, generate_segment)
-                all_audio.append(wav)
-            
-            # Concatenate all segments
-            final_audio = np.concatenate(all_audio) if len(all_audio) > 1 else all_audio[0]
-            
-            return final_audio, self._sample_rate, segments
-            
-        finally:
-            # Cleanup temp file
-            if temp_file and os.path.exists(temp_file.name):
-                try:
-                    os.unlink(temp_file.name)
-                except OSError:
-                    pass
+        # Split texts into segments
+        all_segments = await self._split_texts(texts)
+        logger.info(
+            f"Batch of {len(texts)} texts split into "
+            f"{sum(len(segments) for segments in all_segments)} segments"
+        )
+        
+        # Segments cannot be stacked into one forward pass or gathered
+        # concurrently: decoding is autoregressive with per-sequence early
+        # stopping on a batch-1 KV cache. Running them back-to-back in one
+        # executor job is the fastest schedule this model allows.
+        
+        # Stored voices reuse their encoded prompt across requests;
+        # temporary ones are encoded once for this request
+        reuse_prompt = prompt_audio is not None and not (temp_audio_base64 or temp_audio_path)
+        
+        def generate_all():
+            generate_segment = self._segment_generator(
+                prompt_audio, prompt_text, reuse_prompt, cfg, steps, normalize, denoise
+            )
+            results = []
+            for segments in all_segments:
+                audio = _join_segments(segments, generate_segment)
+                if on_result is not None:
+                    index = len(results)
+                    on_result(index, (audio, self._sample_rate, all_segments[index]))
+                results.append(audio)
+            return results
+        
+        loop = asyncio.get_event_loop()
+        audios = await loop.run_in_executor(self._inference_executor, generate_all)
+        
+        return [
+            (audio, self._sample_rate, segments)
+            for audio, segments in zip(audios, all_segments)
+        ]
     
     async def generate_streaming(
         self,
@@ -273,91 +661,70 @@ class TTSService:
         cfg = cfg_value or settings.default_cfg_value
         steps = inference_timesteps or settings.default_inference_timesteps
         
-        # Resolve voice profile
-        prompt_wav_path = None
-        prompt_text = None
-        temp_file = None
-        
         try:
-            if voice_uuid:
-                voice_service = get_voice_service()
-                voice = voice_service.get_voice(voice_uuid)
-                if not voice:
-                    yield {"event": "error", "message": f"Voice not found: {voice_uuid}"}
-                    return
-                
-                prompt_wav_path = str(voice_service.get_voice_audio_path(voice_uuid))
-                prompt_text = voice["prompt_text"]
-                
-            elif temp_audio_base64:
-                audio_bytes = base64.b64decode(temp_audio_base64)
-                temp_file = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-                temp_file.write(audio_bytes)
-                temp_file.close()
-                prompt_wav_path = temp_file.name
-                
-                if temp_prompt_text:
-                    prompt_text = temp_prompt_text
-                else:
-                    prompt_text = await self.recognize_prompt_text(prompt_wav_path)
+            # Resolve voice profile
+            prompt_audio, prompt_text = await self._resolve_prompt(
+                voice_uuid=voice_uuid,
+                temp_audio_base64=temp_audio_base64,
+                temp_prompt_text=temp_prompt_text,
+            )
+            
+            reuse_prompt = prompt_audio is not None and not temp_audio_base64
             
             # Split text
-            segments = smart_split(text, max_length=settings.split_max_length)
+            segments = (await self._split_texts([text]))[0]
             total_segments = len(segments)
             total_duration = 0.0
             
-            for i, segment in enumerate(segments):
-                # Progress event
-                yield {
-                    "event": "progress",
-                    "segment": i + 1,
-                    "total_segments": total_segments,
-                    "status": "processing"
-                }
-                
-                # Capture variables for closure
-                _segment = segment
-                _prompt_wav_path = prompt_wav_path
-                _prompt_text = prompt_text
-                _cfg = cfg
-                _steps = steps
-                _normalize = normalize
-                _denoise = denoise
-                
-                # Generate
-                def generate_segment():
-                    try:
-                        return self._model.generate(
-                            text=_segment,
-                            prompt_wav_path=_prompt_wav_path,
-                            prompt_text=_prompt_text,
-                            cfg_value=_cfg,
-                            inference_timesteps=_steps,
-                            normalize=_normalize,
-                            denoise=_denoise,
-                        )
-                    except Exception as e:
-                        import traceback
-                        logger.error(f"Model generate error: {traceback.format_exc()}")
-                        raise
-                
-                loop = asyncio.get_event_loop()
-                wav = await loop.run_in_executor(self._executor, generate_segment)
-                
-                # Convert to base64
-                buffer = io.BytesIO()
-                sf.write(buffer, wav, self._sample_rate, format='WAV')
-                audio_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                
-                duration = len(wav) / self._sample_rate
-                total_duration += duration
-                
-                yield {
-                    "event": "audio_chunk",
-                    "segment": i + 1,
-                    "audio_base64": audio_base64,
-                    "duration": round(duration, 3)
-                }
+            # Producer: generate segments back-to-back so inference of the
+            # next segment overlaps with encoding and sending of this one.
+            # The bounded queue caps how far generation runs ahead.
+            loop = asyncio.get_running_loop()
+            generated: asyncio.Queue = asyncio.Queue(maxsize=2)
+            
+            async def produce():
+                try:
+                    generate_segment = await loop.run_in_executor(
+                        self._inference_executor, self._segment_generator,
+                        prompt_audio, prompt_text, reuse_prompt, cfg, steps, normalize, denoise,
+                    )
+                    for segment in segments:
+                        wav = await loop.run_in_executor(self._inference_executor, generate_segment, segment)
+                        await generated.put((wav, None))
+                except Exception as e:
+                    await generated.put((None, e))
+            
+            producer = asyncio.create_task(produce())
+            
+            try:
+                for i in range(total_segments):
+                    # Progress event
+                    yield {
+                        "event": "progress",
+                        "segment": i + 1,
+                        "total_segments": total_segments,
+                        "status": "processing"
+                    }
+                    
+                    wav, error = await generated.get()
+                    if error is not None:
+                        raise error
+                    
+                    # Convert to base64 off the event loop
+                    audio_base64 = await loop.run_in_executor(self._io_executor, self._wav_to_base64, wav)
+                    
+                    duration = wav.shape[-1] / self._sample_rate
+                    total_duration += duration
+                    
+                    yield {
+                        "event": "audio_chunk",
+                        "segment": i + 1,
+                        "audio_base64": audio_base64,
+                        "duration": round(duration, 3)
+                    }
+            finally:
+                # Stop generating ahead if the client went away
+                producer.cancel()
             
             # Done event
             yield {
@@ -365,17 +732,44 @@ class TTSService:
                 "total_duration_seconds": round(total_duration, 3),
                 "total_segments": total_segments
             }
-            
+        
         except Exception as e:
             logger.error(f"Streaming generation error: {e}")
             yield {"event": "error", "message": str(e)}
-            
-        finally:
-            if temp_file and os.path.exists(temp_file.name):
-                try:
-                    os.unlink(temp_file.name)
-                except OSError:
-                    pass
+    
+    def _wav_to_base64(self, audio: np.ndarray) -> str:
+        """
+        Encode audio as a base64 WAV (16-bit PCM) string.
+        
+        Header and samples are written into one pre-sized buffer (reused
+        per thread for streaming-chunk sizes), which is encoded directly;
+        the bytes match audio_to_bytes.
+        """
+        num_samples = len(audio)
+        buffer = self._scratch_buffer(WAV_HEADER_SIZE + num_samples * 2)
+        buffer[:WAV_HEADER_SIZE] = _wav_header(num_samples, self._sample_rate)
+        
+        # Same float -> 16-bit conversion as libsndfile, written in place
+        float_to_pcm16(audio, np.frombuffer(buffer, dtype='<i2', offset=WAV_HEADER_SIZE))
+        
+        return _b64.b64encode(buffer).decode('ascii')
+    
+    def _scratch_buffer(self, size: int) -> memoryview:
+        """
+        Get a writable buffer of ``size`` bytes for the current thread.
+        
+        Sizes up to SCRATCH_BUFFER_MAX_BYTES reuse one buffer per thread;
+        larger ones get a fresh buffer so threads never pin big allocations.
+        """
+        if size > SCRATCH_BUFFER_MAX_BYTES:
+            return memoryview(bytearray(size))
+        
+        buffer = getattr(self._encode_local, "buffer", None)
+        if buffer is None or len(buffer) < size:
+            # Replace rather than resize: numpy views may still reference it
+            buffer = bytearray(max(size, 256 * 1024))
+            self._encode_local.buffer = buffer
+        return memoryview(buffer)[:size]
     
     def audio_to_bytes(self, audio: np.ndarray, format: str = "wav") -> bytes:
         """
@@ -384,7 +778,7 @@ class TTSService:
         Args:
             audio: Audio array
             format: Output format (wav, mp3)
-            
+        
         Returns:
             Audio bytes
         """
@@ -401,6 +795,24 @@ class TTSService:
         
         return buffer.getvalue()
     
+    def open_audio_writer(self, buffer: io.BytesIO, format: str = "wav") -> sf.SoundFile:
+        """
+        Open an incremental encoder writing into ``buffer``.
+        
+        Audio written in pieces produces the same bytes as audio_to_bytes on
+        the concatenated array; the header is finalized on close().
+        
+        Args:
+            buffer: Output buffer
+            format: Output format (wav, mp3)
+        
+        Returns:
+            Writable SoundFile
+        """
+        if format.lower() == "mp3":
+            logger.warning("MP3 format requested but returning WAV (MP3 requires additional dependencies)")
+        return sf.SoundFile(buffer, mode='w', samplerate=self._sample_rate, channels=1, format='WAV')
+    
     def audio_to_base64(self, audio: np.ndarray, format: str = "wav") -> str:
         """
         Convert numpy audio array to base64 string.
@@ -408,12 +820,125 @@ class TTSService:
         Args:
             audio: Audio array
             format: Output format
-            
+        
         Returns:
             Base64 encoded string
         """
-        audio_bytes = self.audio_to_bytes(audio, format)
-        return base64.b64encode(audio_bytes).decode('utf-8')
+        if format.lower() == "mp3":
+            logger.warning("MP3 format requested but returning WAV (MP3 requires additional dependencies)")
+        return self._wav_to_base64(audio)
+    
+    def audio_to_base64_iter(self, audio: np.ndarray, chunk_samples: int = 48000) -> Iterator[str]:
+        """
+        Encode audio as a base64 WAV (16-bit PCM) string in chunks.
+        
+        The pieces concatenate to a single valid base64 string, so callers can
+        stream them without materializing the whole WAV or base64 payload.
+        
+        Args:
+            audio: Audio array
+            chunk_samples: Number of samples encoded per chunk
+        
+        Yields:
+            Base64 encoded string pieces
+        """
+        pending = _wav_header(len(audio), self._sample_rate)
+        
+        for start in range(0, len(audio), chunk_samples):
+            # Same float -> 16-bit conversion as libsndfile, so output matches audio_to_bytes
+            chunk = audio[start:start + chunk_samples]
+            pcm = np.empty(len(chunk), dtype='<i2')
+            float_to_pcm16(chunk, pcm)
+            data = pending + pcm.tobytes()
+            # Only encode whole 3-byte groups so pieces concatenate without padding
+            cut = len(data) - len(data) % 3
+            yield base64.b64encode(data[:cut]).decode('ascii')
+            pending = data[cut:]
+        
+        if pending:
+            yield base64.b64encode(pending).decode('ascii')
+
+
+# Headroom on the first segment's samples-per-character estimate
+SEGMENT_SIZE_MARGIN = 1.2
+
+
+def _join_segments(segments: List[str], generate_segment: Callable[[str], np.ndarray]) -> np.ndarray:
+    """
+    Generate segments into one preallocated audio array.
+    
+    The buffer is sized after the first segment from its samples per
+    character and doubled if the estimate runs short, so each segment is
+    copied in and released as it arrives instead of all of them being held
+    for a final concatenation.
+    
+    Args:
+        segments: Text segments in order
+        generate_segment: Function generating one segment's audio
+    
+    Returns:
+        Audio of all segments
+    """
+    total_chars = sum(len(segment) for segment in segments)
+    audio = None
+    length = 0
+    
+    for i, segment in enumerate(segments):
+        logger.info(f"Generating segment {i+1}/{len(segments)}: {segment[:50]}...")
+        wav = generate_segment(segment)
+        if len(segments) == 1:
+            return wav
+        
+        end = length + len(wav)
+        if audio is None:
+            estimate = int(len(wav) * total_chars / max(1, len(segment)) * SEGMENT_SIZE_MARGIN)
+            audio = np.empty(max(estimate, end), dtype=wav.dtype)
+        elif end > len(audio):
+            grown = np.empty(max(2 * len(audio), end), dtype=audio.dtype)
+            grown[:length] = audio[:length]
+            audio = grown
+        audio[length:end] = wav
+        length = end
+    
+    if audio is None:
+        return np.zeros(0, dtype=np.float32)
+    
+    # Keep a view unless the estimate left a lot of unused space
+    if length < len(audio) * 0.75:
+        return audio[:length].copy()
+    return audio[:length]
+
+
+def _decode_base64_audio(data: str) -> bytes:
+    """
+    Decode base64 temporary voice audio.
+    
+    Raises:
+        InvalidAudioError: If the data is not valid base64
+    """
+    try:
+        return _b64.b64decode(data, validate=True)
+    except binascii.Error as e:
+        raise InvalidAudioError(f"Invalid temp_audio_base64: {e}")
+
+
+# Largest base64 encode served from the per-thread scratch buffer (~45 s at 48 kHz)
+SCRATCH_BUFFER_MAX_BYTES = 4 * 1024 * 1024
+
+# Size of the RIFF/WAVE header written by _wav_header
+WAV_HEADER_SIZE = 44
+
+
+def _wav_header(num_samples: int, sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """Build a 44-byte RIFF/WAVE header for PCM audio."""
+    data_size = num_samples * channels * sample_width
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate,
+        sample_rate * channels * sample_width, channels * sample_width, sample_width * 8,
+        b'data', data_size,
+    )
 
 
 # Singleton instance
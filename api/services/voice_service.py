@@ -2,15 +2,43 @@
 Voice management service for storing and retrieving voice profiles.
 """
 import os
-import json
 import uuid
+import time
+import hashlib
 import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from threading import Lock
 
 from ..config import settings
+from ..utils.jsonfile import load_json, write_json_atomic
+
+# Content types of voice audio files by extension
+CONTENT_TYPE_BY_EXTENSION = {
+    ".wav": "audio/wav",
+    ".mp3": "audio/mpeg",
+    ".ogg": "audio/ogg",
+    ".flac": "audio/flac",
+}
+
+
+class _VoiceSnapshot:
+    """
+    One published version of voices.json plus lookups derived from it.
+    
+    Snapshots are never modified once published (writers build a new
+    metadata dict and publish a new snapshot), so readers need no lock and
+    a lookup cached into an old snapshot can never outlive a write.
+    """
+    
+    def __init__(self, metadata: Dict[str, Dict[str, Any]]):
+        self.metadata = metadata
+        self.voices: Optional[List[Dict[str, Any]]] = None
+        # Per-voice (audio path, content type, filename, etag) for sample requests
+        self.samples: Dict[str, Tuple[str, str, str, Optional[str]]] = {}
+        # Per-voice (metadata, audio path) whose audio file was found on disk
+        self.resolved: Dict[str, Tuple[Dict[str, Any], str]] = {}
 
 
 class VoiceService:
@@ -33,25 +61,69 @@ class VoiceService:
         self.voices_dir.mkdir(parents=True, exist_ok=True)
         
         self.metadata_file = self.voices_dir / "voices.json"
+        # Serializes writers; readers use the current snapshot without it
         self._lock = Lock()
         
         # Load existing metadata
-        self._metadata: Dict[str, Dict[str, Any]] = self._load_metadata()
+        self._snapshot = _VoiceSnapshot(self._load_metadata())
+        
+        # voices.json is re-checked at most once per TTL (other uvicorn
+        # workers may have written it)
+        self._cache_ttl = settings.voice_cache_ttl_seconds
+        self._checked_at = time.monotonic()
+        self._loaded_mtime = self._metadata_mtime()
+    
+    def _metadata_mtime(self) -> Optional[int]:
+        """Get the metadata file modification time (ns), or None if missing."""
+        try:
+            return self.metadata_file.stat().st_mtime_ns
+        except OSError:
+            return None
+    
+    def _current(self) -> _VoiceSnapshot:
+        """
+        Get the current snapshot.
+        
+        Reloads metadata if the TTL expired and the file changed on disk.
+        Must not be called with the lock held.
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self._cache_ttl:
+            return self._snapshot
+        
+        with self._lock:
+            self._checked_at = now
+            mtime = self._metadata_mtime()
+            if mtime != self._loaded_mtime:
+                self._snapshot = _VoiceSnapshot(self._load_metadata())
+                self._loaded_mtime = mtime
+            return self._snapshot
+    
+    def _fresh_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the metadata as currently on disk (caller holds the lock).
+        
+        Writers always re-check the file, ignoring the TTL, so they never
+        build on a snapshot that misses another worker's write.
+        """
+        mtime = self._metadata_mtime()
+        if mtime != self._loaded_mtime:
+            self._snapshot = _VoiceSnapshot(self._load_metadata())
+            self._loaded_mtime = mtime
+        self._checked_at = time.monotonic()
+        return self._snapshot.metadata
     
     def _load_metadata(self) -> Dict[str, Dict[str, Any]]:
         """Load metadata from JSON file."""
-        if self.metadata_file.exists():
-            try:
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                return {}
-        return {}
-    
-    def _save_metadata(self):
-        """Save metadata to JSON file."""
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self._metadata, f, ensure_ascii=False, indent=2, default=str)
+        return load_json(self.metadata_file)
+    
+    def _save_metadata(self, metadata: Dict[str, Dict[str, Any]]):
+        """Save new metadata to JSON file atomically and publish it (caller holds the lock)."""
+        write_json_atomic(self.metadata_file, metadata)
+        
+        # Our own write is not a foreign change
+        self._loaded_mtime = self._metadata_mtime()
+        self._snapshot = _VoiceSnapshot(metadata)
     
     def create_voice(
         self,
@@ -74,7 +146,7 @@ class VoiceService:
             description: Voice description for Podcast (optional)
             suitable_for: List of suitable scenarios (optional)
             for_podcast: Whether this voice is suitable for Podcast
-            
+        
         Returns:
             Voice metadata dict
         """
@@ -95,6 +167,8 @@ class VoiceService:
             "voice_name": voice_name,
             "prompt_text": prompt_text,
             "audio_filename": audio_filename,
+            # Content hash, served as the sample audio's ETag
+            "audio_etag": hashlib.blake2b(audio_data, digest_size=16).hexdigest(),
             "created_at": now.isoformat(),
             # Podcast metadata (optional)
             "description": description or "",
@@ -104,8 +178,7 @@ class VoiceService:
         
         # Store metadata
         with self._lock:
-            self._metadata[voice_uuid] = metadata
-            self._save_metadata()
+            self._save_metadata({**self._fresh_metadata(), voice_uuid: metadata})
         
         return metadata
     
@@ -115,11 +188,11 @@ class VoiceService:
         
         Args:
             voice_uuid: Voice UUID
-            
+        
         Returns:
             Voice metadata dict or None if not found
         """
-        return self._metadata.get(voice_uuid)
+        return self._current().metadata.get(voice_uuid)
     
     def get_voice_audio_path(self, voice_uuid: str) -> Optional[Path]:
         """
@@ -127,27 +200,84 @@ class VoiceService:
         
         Args:
             voice_uuid: Voice UUID
-            
+        
         Returns:
             Path to audio file or None if not found
         """
-        voice = self.get_voice(voice_uuid)
-        if not voice:
-            return None
+        resolved = self.resolve_voice(voice_uuid)
+        return Path(resolved[1]) if resolved else None
+    
+    def resolve_voice(self, voice_uuid: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """
+        Get a voice's metadata and audio path for generation.
+        
+        The audio file is checked once; the result is cached until the
+        metadata changes (voice audio is never replaced in place).
+        
+        Args:
+            voice_uuid: Voice UUID
         
-        audio_path = self.voices_dir / voice_uuid / voice["audio_filename"]
-        if audio_path.exists():
-            return audio_path
-        return None
+        Returns:
+            Tuple of (metadata, audio path), or None if the voice or its audio
+            file is not found
+        """
+        snapshot = self._current()
+        resolved = snapshot.resolved.get(voice_uuid)
+        if resolved is None:
+            voice = snapshot.metadata.get(voice_uuid)
+            if not voice:
+                return None
+            
+            audio_path = self.voices_dir / voice_uuid / voice["audio_filename"]
+            if not audio_path.exists():
+                return None
+            
+            resolved = snapshot.resolved[voice_uuid] = (voice, str(audio_path))
+        return resolved
+    
+    def get_voice_sample(self, voice_uuid: str) -> Optional[Tuple[str, str, str, Optional[str]]]:
+        """
+        Get what is needed to serve a voice's sample audio.
+        
+        Derived once per voice, so sample requests are a dict lookup.
+        
+        Args:
+            voice_uuid: Voice UUID
+        
+        Returns:
+            Tuple of (audio path, content type, download filename, quoted
+            ETag or None for voices created before hashes were stored), or
+            None if the voice is not found
+        """
+        snapshot = self._current()
+        sample = snapshot.samples.get(voice_uuid)
+        if sample is None:
+            voice = snapshot.metadata.get(voice_uuid)
+            if not voice:
+                return None
+            
+            filename = voice["audio_filename"]
+            ext = os.path.splitext(filename)[1].lower()
+            sample = (
+                str(self.voices_dir / voice_uuid / filename),
+                CONTENT_TYPE_BY_EXTENSION.get(ext, "audio/wav"),
+                f"sample{ext}",
+                f'"{voice["audio_etag"]}"' if voice.get("audio_etag") else None,
+            )
+            snapshot.samples[voice_uuid] = sample
+        return sample
     
     def list_voices(self) -> List[Dict[str, Any]]:
         """
         List all voices.
         
         Returns:
-            List of voice metadata dicts
+            List of voice metadata dicts (a shared snapshot; do not modify)
         """
-        return list(self._metadata.values())
+        snapshot = self._current()
+        if snapshot.voices is None:
+            snapshot.voices = list(snapshot.metadata.values())
+        return snapshot.voices
     
     def delete_voice(self, voice_uuid: str) -> bool:
         """
@@ -155,28 +285,27 @@ class VoiceService:
         
         Args:
             voice_uuid: Voice UUID
-            
+        
         Returns:
             True if deleted, False if not found
         """
-        if voice_uuid not in self._metadata:
-            return False
+        # Check and remove in one step, so concurrent deletes cannot race
+        with self._lock:
+            metadata = dict(self._fresh_metadata())
+            if metadata.pop(voice_uuid, None) is None:
+                return False
+            self._save_metadata(metadata)
         
         # Remove directory
         voice_dir = self.voices_dir / voice_uuid
         if voice_dir.exists():
             shutil.rmtree(voice_dir)
         
-        # Remove from metadata
-        with self._lock:
-            del self._metadata[voice_uuid]
-            self._save_metadata()
-        
         return True
     
     def voice_exists(self, voice_uuid: str) -> bool:
         """Check if a voice exists."""
-        return voice_uuid in self._metadata
+        return voice_uuid in self._current().metadata
     
     def update_voice(
         self,
@@ -195,17 +324,17 @@ class VoiceService:
             description: New description (optional)
             suitable_for: New suitable_for list (optional)
             for_podcast: New for_podcast flag (optional)
-            
+        
         Returns:
             Updated voice metadata dict or None if not found
         """
-        if voice_uuid not in self._metadata:
-            return None
-        
         with self._lock:
-            voice = self._metadata[voice_uuid]
+            metadata = self._fresh_metadata()
+            if voice_uuid not in metadata:
+                return None
             
-            # Update only provided fields
+            # Update only provided fields, on a copy (snapshots are shared)
+            voice = dict(metadata[voice_uuid])
             if voice_name is not None:
                 voice["voice_name"] = voice_name
             if description is not None:
@@ -215,7 +344,7 @@ class VoiceService:
             if for_podcast is not None:
                 voice["for_podcast"] = for_podcast
             
-            self._save_metadata()
+            self._save_metadata({**metadata, voice_uuid: voice})
         
         return voice
 
@@ -2,14 +2,18 @@
 Cleanup utilities for managing temporary files.
 """
 import os
-import json
+import time
+import heapq
+import shutil
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List
+from threading import Lock
 import logging
 
 from ..config import settings
+from .jsonfile import load_json, write_json_atomic
 
 logger = logging.getLogger(__name__)
 
@@ -37,22 +41,32 @@ class GeneratedAudioManager:
         self.expire_hours = expire_hours or settings.generated_audio_expire_hours
         self.metadata_file = self.generated_dir / "metadata.json"
         
+        # save_audio may run in worker threads
+        self._lock = Lock()
         self._metadata = self._load_metadata()
+        
+        # Min-heap of (expires_at_ts, audio_id), so cleanup only touches due
+        # entries; entries of audio deleted otherwise are skipped when popped
+        self._expiry_heap = [(meta["expires_at_ts"], audio_id) for audio_id, meta in self._metadata.items()]
+        heapq.heapify(self._expiry_heap)
     
     def _load_metadata(self) -> dict:
         """Load metadata from file."""
-        if self.metadata_file.exists():
-            try:
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                return {}
-        return {}
+        metadata = load_json(self.metadata_file)
+        
+        # Entries saved before expires_at_ts was stored (unreadable ones expire)
+        for meta in metadata.values():
+            if "expires_at_ts" not in meta:
+                try:
+                    expires_at = datetime.fromisoformat(meta["expires_at"])
+                    meta["expires_at_ts"] = expires_at.replace(tzinfo=timezone.utc).timestamp()
+                except (KeyError, TypeError, ValueError):
+                    meta["expires_at_ts"] = 0.0
+        return metadata
     
     def _save_metadata(self):
-        """Save metadata to file."""
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self._metadata, f, ensure_ascii=False, indent=2)
+        """Save metadata to file (atomically)."""
+        write_json_atomic(self.metadata_file, self._metadata)
     
     def save_audio(
         self,
@@ -71,7 +85,7 @@ class GeneratedAudioManager:
             format: Audio format (wav, mp3)
             sample_rate: Audio sample rate
             duration_seconds: Audio duration
-            
+        
         Returns:
             Metadata dict with download info
         """
@@ -82,9 +96,57 @@ class GeneratedAudioManager:
         with open(filepath, 'wb') as f:
             f.write(audio_data)
         
+        return self._add_metadata(audio_id, filename, format, sample_rate, duration_seconds)
+    
+    def link_audio(self, source_id: str, audio_id: str) -> Optional[dict]:
+        """
+        Store an existing audio file under another ID.
+        
+        The file is hard-linked (copied where links are unsupported), so both
+        IDs stay downloadable and expire independently.
+        
+        Args:
+            source_id: ID of the stored audio
+            audio_id: New ID for the audio
+        
+        Returns:
+            Metadata dict of the new ID, or None if the source is gone
+        """
+        source_path = self.get_audio_path(source_id)
+        source = self._metadata.get(source_id)
+        if source_path is None or source is None:
+            return None
+        
+        filename = f"{audio_id}.{source['format']}"
+        filepath = self.generated_dir / filename
+        
+        try:
+            filepath.unlink(missing_ok=True)
+            try:
+                os.link(source_path, filepath)
+            except OSError:
+                shutil.copyfile(source_path, filepath)
+        except FileNotFoundError:
+            # Source expired in the meantime
+            return None
+        
+        return self._add_metadata(
+            audio_id, filename, source["format"], source["sample_rate"], source["duration_seconds"]
+        )
+    
+    def _add_metadata(
+        self,
+        audio_id: str,
+        filename: str,
+        format: str,
+        sample_rate: int,
+        duration_seconds: float
+    ) -> dict:
+        """Record metadata for a stored audio file."""
         # Create metadata
         now = datetime.utcnow()
         expires_at = now + timedelta(hours=self.expire_hours)
+        expires_at_ts = time.time() + self.expire_hours * 3600
         
         metadata = {
             "audio_id": audio_id,
@@ -94,10 +156,13 @@ class GeneratedAudioManager:
             "duration_seconds": duration_seconds,
             "created_at": now.isoformat(),
             "expires_at": expires_at.isoformat(),
+            "expires_at_ts": expires_at_ts,  # Unix time, compared on every lookup
         }
         
-        self._metadata[audio_id] = metadata
-        self._save_metadata()
+        with self._lock:
+            self._metadata[audio_id] = metadata
+            heapq.heappush(self._expiry_heap, (expires_at_ts, audio_id))
+            self._save_metadata()
         
         return metadata
     
@@ -107,7 +172,7 @@ class GeneratedAudioManager:
         
         Args:
             audio_id: Audio ID
-            
+        
         Returns:
             Path to file or None if not found/expired
         """
@@ -115,9 +180,8 @@ class GeneratedAudioManager:
             return None
         
         meta = self._metadata[audio_id]
-        expires_at = datetime.fromisoformat(meta["expires_at"])
         
-        if datetime.utcnow() > expires_at:
+        if time.time() > meta["expires_at_ts"]:
             # Expired, clean up
             self._delete_audio(audio_id)
             return None
@@ -133,9 +197,8 @@ class GeneratedAudioManager:
             return None
         
         meta = self._metadata[audio_id]
-        expires_at = datetime.fromisoformat(meta["expires_at"])
         
-        if datetime.utcnow() > expires_at:
+        if time.time() > meta["expires_at_ts"]:
             self._delete_audio(audio_id)
             return None
         
@@ -143,16 +206,23 @@ class GeneratedAudioManager:
     
     def _delete_audio(self, audio_id: str):
         """Delete an audio file and its metadata."""
-        if audio_id in self._metadata:
-            meta = self._metadata[audio_id]
-            filepath = self.generated_dir / meta["filename"]
-            if filepath.exists():
-                try:
-                    filepath.unlink()
-                except OSError:
-                    pass
-            del self._metadata[audio_id]
+        self._delete_audios([audio_id])
+    
+    def _delete_audios(self, audio_ids: List[str]):
+        """Delete several audio files, saving the metadata once."""
+        with self._lock:
+            removed = [self._metadata.pop(audio_id, None) for audio_id in audio_ids]
+            removed = [meta for meta in removed if meta is not None]
+            if not removed:
+                return
             self._save_metadata()
+        
+        for meta in removed:
+            filepath = self.generated_dir / meta["filename"]
+            try:
+                filepath.unlink(missing_ok=True)
+            except OSError:
+                pass
     
     def cleanup_expired(self) -> int:
         """
@@ -161,22 +231,38 @@ class GeneratedAudioManager:
         Returns:
             Number of files cleaned up
         """
-        now = datetime.utcnow()
+        now = time.time()
         expired_ids = []
         
-        for audio_id, meta in list(self._metadata.items()):
-            try:
-                expires_at = datetime.fromisoformat(meta["expires_at"])
-                if now > expires_at:
+        with self._lock:
+            while self._expiry_heap and now > self._expiry_heap[0][0]:
+                expires_at_ts, audio_id = heapq.heappop(self._expiry_heap)
+                if self._is_current(expires_at_ts, audio_id):
                     expired_ids.append(audio_id)
-            except (KeyError, ValueError):
-                expired_ids.append(audio_id)
         
-        for audio_id in expired_ids:
-            self._delete_audio(audio_id)
+        self._delete_audios(expired_ids)
         
-        logger.info(f"Cleaned up {len(expired_ids)} expired audio files")
+        if expired_ids:
+            logger.info(f"Cleaned up {len(expired_ids)} expired audio files")
         return len(expired_ids)
+    
+    def next_expiry(self) -> Optional[float]:
+        """
+        Get when the next file expires.
+        
+        Returns:
+            Unix time of the earliest expiry, or None if there are no files
+        """
+        with self._lock:
+            heap = self._expiry_heap
+            while heap and not self._is_current(*heap[0]):
+                heapq.heappop(heap)
+            return heap[0][0] if heap else None
+    
+    def _is_current(self, expires_at_ts: float, audio_id: str) -> bool:
+        """Whether a heap entry still refers to stored audio (caller holds the lock)."""
+        meta = self._metadata.get(audio_id)
+        return meta is not None and meta["expires_at_ts"] == expires_at_ts
 
 
 # Singleton instance
@@ -192,13 +278,24 @@ def get_audio_manager() -> GeneratedAudioManager:
 
 
 async def cleanup_task():
-    """Background task to periodically clean up expired files."""
+    """
+    Background task cleaning up expired files.
+    
+    Sleeps until the next file expires, but at most the cleanup interval.
+    New files always expire after the existing ones, so saving never needs
+    to wake the task early.
+    """
     manager = get_audio_manager()
     interval = settings.cleanup_interval_minutes * 60
     
     while True:
         try:
-            await asyncio.sleep(interval)
+            next_expiry = manager.next_expiry()
+            delay = interval
+            if next_expiry is not None:
+                # At least a second, so files expiring together go in one pass
+                delay = min(interval, max(1.0, next_expiry - time.time()))
+            await asyncio.sleep(delay)
             manager.cleanup_expired()
         except asyncio.CancelledError:
             break
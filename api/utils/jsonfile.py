@@ -0,0 +1,51 @@
+"""
+JSON metadata file helpers.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+import orjson
+
+
+def load_json(path: Path) -> dict:
+    """
+    Load a JSON object from file.
+    
+    Returns:
+        Parsed dict, or an empty dict if the file is missing or unreadable
+    """
+    try:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    except (orjson.JSONDecodeError, OSError):
+        return {}
+
+
+def write_json_atomic(path: Path, data: dict):
+    """
+    Write a JSON object to file atomically.
+    
+    The data is written to a temporary file in the same directory and
+    renamed over the target, so readers (and a crash mid-write) never see a
+    partially written file.
+    
+    Args:
+        path: Target file
+        data: JSON-serializable dict
+    """
+    payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str)
+    
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        # mkstemp creates 0600 files; keep the usual permissions
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
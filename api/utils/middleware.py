@@ -0,0 +1,92 @@
+"""
+ASGI middleware.
+"""
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+
+from .responses import FastJSONResponse
+
+
+def _media_type(content_type: bytes) -> bytes:
+    """Get the lowercased media type of a Content-Type header, without parameters."""
+    return content_type.split(b";", 1)[0].strip().lower()
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject JSON and multipart requests whose body exceeds a limit.
+    
+    A declared Content-Length over the limit is rejected before the body is
+    read; bodies without one (chunked transfer) are counted as they arrive
+    and rejected as soon as they cross the limit, so oversize payloads are
+    never fully buffered, spooled to disk or parsed. Large temporary voices
+    should use the multipart endpoint.
+    """
+    
+    def __init__(self, app, max_bytes: int, multipart_limits: Optional[Dict[str, int]] = None):
+        """
+        Initialize the middleware.
+        
+        Args:
+            app: Wrapped ASGI application
+            max_bytes: Maximum body size of application/json requests
+            multipart_limits: Maximum body size of multipart/form-data
+                requests by path (other paths are not limited)
+        """
+        self.app = app
+        self.max_bytes = max_bytes
+        self.multipart_limits = multipart_limits or {}
+    
+    def _limit(self, scope, content_type: bytes) -> Optional[int]:
+        """Get the body size limit of a request, or None if it is not limited."""
+        media_type = _media_type(content_type)
+        if media_type == b"application/json":
+            return self.max_bytes
+        if media_type == b"multipart/form-data":
+            return self.multipart_limits.get(scope["path"].rstrip("/") or "/")
+        return None
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        headers = dict(scope["headers"])
+        max_bytes = self._limit(scope, headers.get(b"content-type", b""))
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+        
+        detail = f"Request body too large. Maximum size: {max_bytes} bytes"
+        content_length = headers.get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            await FastJSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+        
+        received = 0
+        response_started = False
+        
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # FastAPI re-raises HTTPExceptions from body reading
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+        
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except HTTPException as e:
+            # Raised outside a route's exception handling
+            if e.status_code != 413 or response_started:
+                raise
+            await FastJSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
@@ -0,0 +1,50 @@
+"""
+Float -> 16-bit PCM conversion for WAV encoding.
+"""
+import numpy as np
+
+# numba comes with librosa; fall back to NumPy when it is missing
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _float_to_pcm16_numpy(audio: np.ndarray, out: np.ndarray):
+    """NumPy version of float_to_pcm16 (allocates one temporary array)."""
+    np.clip(np.floor(audio * 32768.0), -32768, 32767, out=out, casting='unsafe')
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _float_to_pcm16_numba(audio, out):
+        # Single pass, no temporaries; no fastmath so rounding matches libsndfile
+        for i in range(audio.shape[0]):
+            v = np.floor(audio[i] * 32768.0)
+            if v > 32767.0:
+                v = 32767.0
+            elif v < -32768.0:
+                v = -32768.0
+            out[i] = np.int16(v)
+
+
+def float_to_pcm16(audio: np.ndarray, out: np.ndarray):
+    """
+    Convert float samples to 16-bit PCM the same way libsndfile does.
+    
+    Args:
+        audio: 1-D float audio array
+        out: int16 array of the same length to write into (may be a view
+            into a larger buffer)
+    """
+    if njit is not None and audio.ndim == 1:
+        _float_to_pcm16_numba(audio, out)
+    else:
+        _float_to_pcm16_numpy(audio, out)
+
+
+def warmup():
+    """Compile (or load from cache) the numba kernel ahead of the first request."""
+    out = np.empty(1, dtype=np.int16)
+    float_to_pcm16(np.zeros(1, dtype=np.float32), out)
+    float_to_pcm16(np.zeros(1, dtype=np.float64), out)
@@ -0,0 +1,32 @@
+"""
+Response classes.
+"""
+import orjson
+from fastapi.responses import FileResponse, JSONResponse
+
+
+class AudioFileResponse(FileResponse):
+    """
+    FileResponse tuned for audio files.
+    
+    Starlette reads files through a worker thread one chunk at a time, so
+    every chunk costs a thread hop and a read syscall. Audio files are a few
+    MB, so larger chunks serve most of them in a handful of reads. Servers
+    supporting the ``http.response.pathsend`` extension skip the reads
+    entirely.
+    """
+    
+    chunk_size = 1024 * 1024
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson.
+    
+    Used for payloads that skip response_model validation, such as large
+    base64 audio bodies and voice lists, where the stdlib encoder dominates
+    the request time. FastAPI has deprecated its own ORJSONResponse.
+    """
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
@@ -3,7 +3,15 @@ Smart text splitting for TTS generation.
 Splits long text into manageable segments while preserving semantic meaning.
 """
 import re
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
+
+
+def _segment_pattern(delimiters: str) -> re.Pattern:
+    """Compile a pattern matching one segment: text up to and including a delimiter, or trailing text."""
+    # delimiters is a character class such as r'[。！？]'
+    chars = delimiters[1:-1]
+    return re.compile(f'[^{chars}]*[{chars}]|[^{chars}]+')
 
 
 class TextSplitter:
@@ -23,14 +31,16 @@ class TextSplitter:
     # Quote patterns to handle
     QUOTE_PATTERNS = r'["""\'\'「」『』【】]'
     
-    def __init__(self, max_length: int = 300):
+    def __init__(self, max_length: int = 300, min_length: int = 20):
         """
         Initialize the text splitter.
         
         Args:
             max_length: Maximum characters per segment
+            min_length: Segments shorter than this are merged with the next one
         """
         self.max_length = max_length
+        self.min_length = min_length
     
     def split(self, text: str) -> List[str]:
         """
@@ -42,84 +52,86 @@ class TextSplitter:
         Returns:
             List of text segments
         """
-        if not text or not text.strip():
+        text = text.strip()
+        if not text:
             return []
         
-        # Normalize whitespace
-        text = self._normalize_text(text)
+        # Normalize whitespace (only needed when there are runs to collapse)
+        if '\n\n' in text or '  ' in text:
+            text = self._normalize_text(text)
         
         # If text is short enough, return as-is
-        if len(text) <= self.max_length:
+        max_length = self.max_length
+        if len(text) <= max_length:
             return [text]
         
-        # First pass: split by primary delimiters
-        segments = self._split_by_pattern(text, self.PRIMARY_DELIMITERS)
+        # First pass: split by primary delimiters (newline is the only ASCII one)
+        if text.isascii():
+            segments = self._split_lines(text)
+        else:
+            segments = self._split_by_pattern(text, _PRIMARY_SPLIT_RE)
         
-        # Second pass: further split segments that are still too long
+        # Second pass: further split segments that are still too long; short
+        # segments are merged as they are emitted
         result = []
+        emit = self._emit
         for segment in segments:
-            if len(segment) <= self.max_length:
-                result.append(segment)
+            if len(segment) <= max_length:
+                emit(result, segment)
             else:
                 # Try secondary delimiters
-                sub_segments = self._split_by_pattern(segment, self.SECONDARY_DELIMITERS)
+                sub_segments = self._split_by_pattern(segment, _SECONDARY_SPLIT_RE)
                 for sub in sub_segments:
-                    if len(sub) <= self.max_length:
-                        result.append(sub)
+                    if len(sub) <= max_length:
+                        emit(result, sub)
                     else:
                         # Hard split by max_length at word boundaries
-                        result.extend(self._hard_split(sub))
-        
-        # Filter empty segments and strip
-        result = [s.strip() for s in result if s.strip()]
-        
-        # Merge very short segments with neighbors if possible
-        result = self._merge_short_segments(result, min_length=20)
+                        for piece in self._hard_split(sub):
+                            emit(result, piece)
         
         return result
     
     def _normalize_text(self, text: str) -> str:
         """Normalize whitespace and clean up text."""
         # Replace multiple newlines with single
-        text = re.sub(r'\n+', '\n', text)
+        text = _NL_RE.sub('\n', text)
         # Replace multiple spaces with single
-        text = re.sub(r' +', ' ', text)
+        text = _SP_RE.sub(' ', text)
         # Strip
         text = text.strip()
         return text
     
-    def _split_by_pattern(self, text: str, pattern: str) -> List[str]:
+    def _split_by_pattern(self, text: str, pattern: re.Pattern) -> List[str]:
         """
         Split text by regex pattern while keeping delimiters attached.
         
         Args:
             text: Text to split
-            pattern: Regex pattern for delimiters
+            pattern: Segment pattern from _segment_pattern
             
         Returns:
             List of segments with delimiters attached to preceding text
         """
-        # Split but keep delimiter
-        parts = re.split(f'({pattern})', text)
-        
-        # Recombine: attach delimiter to preceding text
-        segments = []
-        current = ""
-        
-        for i, part in enumerate(parts):
-            if re.match(pattern, part):
-                # This is a delimiter, attach to current
-                current += part
-                if current.strip():
-                    segments.append(current)
-                current = ""
-            else:
-                current += part
+        # One C-level pass yields the segments with their delimiters already
+        # attached; only whitespace-only segments are dropped
+        return [segment for segment in pattern.findall(text) if not segment.isspace()]
+    
+    def _split_lines(self, text: str) -> List[str]:
+        """
+        Split text at newlines, the same as _split_by_pattern with PRIMARY_DELIMITERS
+        for text without CJK punctuation.
         
-        # Don't forget the last part
-        if current.strip():
-            segments.append(current)
+        Args:
+            text: Text to split
         
+        Returns:
+            List of lines with their newline attached
+        """
+        lines = text.split('\n')
+        last = lines.pop()
+        segments = [line + '\n' for line in lines if line and not line.isspace()]
+        if last and not last.isspace():
+            segments.append(last)
         return segments
     
     def _hard_split(self, text: str) -> List[str]:
@@ -134,15 +146,21 @@ class TextSplitter:
             List of segments
         """
         segments = []
-        remaining = text
+        max_length = self.max_length
+        search_offset = max(0, max_length - 50)
         
-        while len(remaining) > self.max_length:
+        # Walk indices into text instead of re-slicing the remainder each step;
+        # after the first split the remainder is stripped at both ends
+        pos, end = 0, len(text)
+        stripped_end = len(text.rstrip())
+        
+        while end - pos > max_length:
             # Try to find a space near the max_length boundary
-            split_point = self.max_length
+            split_point = pos + max_length
             
             # Look backwards for a space (prefer word boundary)
-            search_start = max(0, self.max_length - 50)
-            space_pos = remaining.rfind(' ', search_start, self.max_length)
+            search_start = pos + search_offset
+            space_pos = text.rfind(' ', search_start, split_point)
             
             if space_pos > search_start:
                 split_point = space_pos
@@ -150,64 +168,83 @@ class TextSplitter:
             # Also check for Chinese/Japanese word boundaries (harder)
             # For now, just use the found position or max_length
             
-            segment = remaining[:split_point].strip()
+            segment = text[pos:split_point].strip()
             if segment:
                 segments.append(segment)
-            remaining = remaining[split_point:].strip()
+            pos = _LEADING_WS_RE.match(text, split_point).end()
+            end = stripped_end
         
-        if remaining:
-            segments.append(remaining)
+        if pos < end:
+            segments.append(text[pos:end])
         
         return segments
     
-    def _merge_short_segments(self, segments: List[str], min_length: int = 20) -> List[str]:
+    def _emit(self, result: List[str], segment: str):
         """
-        Merge very short segments with their neighbors.
+        Append a stripped segment to result, merging it into the previous one
+        while that is shorter than ``min_length``.
+        
+        A segment only grows while it is short, so each merge concatenates at
+        most ``max_length`` characters.
         
         Args:
-            segments: List of segments
-            min_length: Minimum desired segment length
-            
-        Returns:
-            Merged segments
+            result: Segments emitted so far
+            segment: Next segment (dropped if only whitespace)
         """
-        if len(segments) <= 1:
-            return segments
-        
-        result = []
-        i = 0
+        segment = segment.strip()
+        if not segment:
+            return
         
-        while i < len(segments):
-            current = segments[i]
-            
-            # If current is short and we can merge with next
-            while (len(current) < min_length and 
-                   i + 1 < len(segments) and 
-                   len(current) + len(segments[i + 1]) <= self.max_length):
-                i += 1
-                current = current + segments[i]
-            
-            result.append(current)
-            i += 1
+        if result:
+            last_length = len(result[-1])
+            if last_length < self.min_length and last_length + len(segment) <= self.max_length:
+                result[-1] += segment
+                return
         
-        return result
+        result.append(segment)
+
+
+# Patterns compiled once for all splitters
+_PRIMARY_SPLIT_RE = _segment_pattern(TextSplitter.PRIMARY_DELIMITERS)
+_SECONDARY_SPLIT_RE = _segment_pattern(TextSplitter.SECONDARY_DELIMITERS)
+# Whitespace runs collapsed by _normalize_text
+_NL_RE = re.compile(r'\n+')
+_SP_RE = re.compile(r' +')
+# Whitespace skipped after a hard split (same characters as str.strip)
+_LEADING_WS_RE = re.compile(r'\s*')
+
+
+@lru_cache(maxsize=32)
+def _get_splitter(max_length: int) -> TextSplitter:
+    """Get a shared splitter for a segment length."""
+    return TextSplitter(max_length=max_length)
 
 
 # Singleton instance with default settings
-default_splitter = TextSplitter(max_length=300)
+default_splitter = _get_splitter(300)
+
+
+@lru_cache(maxsize=512)
+def _split_cached(text: str, max_length: int) -> Tuple[str, ...]:
+    """Split text, remembering the segments of recently seen texts."""
+    return tuple(_get_splitter(max_length).split(text))
 
 
 def smart_split(text: str, max_length: int = 300) -> List[str]:
     """
     Convenience function for smart text splitting.
     
+    Results for recently split texts are cached (512 entries), so repeated
+    texts skip the splitting pipeline.
+    
     Args:
         text: Input text
         max_length: Maximum characters per segment
         
     Returns:
-        List of text segments
+        List of text segments (a new list; callers may modify it)
     """
-    if max_length == 300:
-        return default_splitter.split(text)
-    return TextSplitter(max_length=max_length).split(text)
+    return list(_split_cached(text, max_length))
+
+
+smart_split.cache_clear = _split_cached.cache_clear
@@ -8,12 +8,29 @@ import os
 import sys
 import json
 import base64
+import struct
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 
+# orjson (installed with the api extra) parses SSE payloads faster
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 # API base URL
 API_BASE_URL = os.environ.get("VOXCPM_API_URL", "http://localhost:8000")
 
+# Shared session so calls reuse pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+# Streamed chunks are 16-bit PCM WAV files with a plain 44-byte header
+WAV_HEADER_SIZE = 44
+
 
 def upload_voice(audio_path: str, voice_name: str, prompt_text: str = None) -> dict:
     """
@@ -35,7 +52,7 @@ def upload_voice(audio_path: str, voice_name: str, prompt_text: str = None) -> d
         if prompt_text:
             data["prompt_text"] = prompt_text
         
-        response = requests.post(url, files=files, data=data)
+        response = SESSION.post(url, files=files, data=data)
     
     response.raise_for_status()
     return response.json()
@@ -44,7 +61,7 @@ def upload_voice(audio_path: str, voice_name: str, prompt_text: str = None) -> d
 def list_voices() -> list:
     """List all uploaded voices."""
     url = f"{API_BASE_URL}/voices"
-    response = requests.get(url)
+    response = SESSION.get(url)
     response.raise_for_status()
     return response.json()["voices"]
 
@@ -52,7 +69,7 @@ def list_voices() -> list:
 def delete_voice(voice_uuid: str) -> bool:
     """Delete a voice profile."""
     url = f"{API_BASE_URL}/voices/{voice_uuid}"
-    response = requests.delete(url)
+    response = SESSION.delete(url)
     response.raise_for_status()
     return response.json()["success"]
 
@@ -75,7 +92,8 @@ def generate_tts(
         text: Text to synthesize
         voice_uuid: UUID of uploaded voice (optional)
         output_path: Path to save audio file
-        output_format: "wav", "mp3", or "base64"
+        output_format: "wav", "mp3", or "base64" (base64 embeds the audio in
+            JSON, about a third larger than the raw file)
         cfg_value: CFG guidance value
         inference_timesteps: Number of inference steps
         normalize: Text normalization
@@ -100,7 +118,7 @@ def generate_tts(
     if voice_uuid:
         payload["voice_uuid"] = voice_uuid
     
-    response = requests.post(url, json=payload)
+    response = SESSION.post(url, json=payload, stream=output_format != "base64")
     response.raise_for_status()
     
     if output_format == "base64":
@@ -116,17 +134,19 @@ def generate_tts(
             print(f"Download URL: {API_BASE_URL}{result['download_url']}")
         return result
     else:
-        # Direct audio response
+        # Direct audio response, written to disk as it downloads
         with open(output_path, "wb") as f:
-            f.write(response.content)
-        print(f"Audio saved to: {output_path}")
-        print(f"Sample rate: {response.headers.get('X-Sample-Rate')}")
-        print(f"Duration: {response.headers.get('X-Duration-Seconds')}s")
-        return {
-            "sample_rate": response.headers.get("X-Sample-Rate"),
-            "duration_seconds": response.headers.get("X-Duration-Seconds"),
-            "segments": response.headers.get("X-Segments"),
+            for chunk in response.iter_content(chunk_size=65536):
+                f.write(chunk)
+        result = {
+            "sample_rate": int(response.headers["X-Sample-Rate"]),
+            "duration_seconds": float(response.headers["X-Duration-Seconds"]),
+            "segments": int(response.headers["X-Segments"]),
         }
+        print(f"Audio saved to: {output_path}")
+        print(f"Sample rate: {result['sample_rate']}")
+        print(f"Duration: {result['duration_seconds']:.2f}s")
+        return result
 
 
 def generate_tts_with_temp_voice(
@@ -147,21 +167,20 @@ def generate_tts_with_temp_voice(
     Returns:
         Response metadata
     """
-    url = f"{API_BASE_URL}/tts/generate"
+    url = f"{API_BASE_URL}/tts/generate/multipart"
     
-    # Read and encode audio
-    with open(audio_path, "rb") as f:
-        audio_base64 = base64.b64encode(f.read()).decode("utf-8")
-    
-    payload = {
+    data = {
         "text": text,
-        "temp_audio_base64": audio_base64,
         "output_format": "base64",
     }
     if prompt_text:
-        payload["temp_prompt_text"] = prompt_text
+        data["temp_prompt_text"] = prompt_text
+    
+    # Upload the audio as a file part instead of base64 inside JSON
+    with open(audio_path, "rb") as f:
+        files = {"temp_audio": (Path(audio_path).name, f, "audio/wav")}
+        response = SESSION.post(url, data=data, files=files)
     
-    response = requests.post(url, json=payload)
     response.raise_for_status()
     
     result = response.json()
@@ -173,6 +192,32 @@ def generate_tts_with_temp_voice(
     return result
 
 
+def _sse_events(response):
+    """
+    Parse a server-sent events response.
+    
+    Yields:
+        (event type, decoded JSON data) per event
+    """
+    event_type = "message"
+    data_lines = []
+    
+    for line in response.iter_lines(chunk_size=65536):
+        if not line:
+            # Blank line ends the event
+            if data_lines:
+                yield event_type, json_loads(b"\n".join(data_lines))
+            event_type = "message"
+            data_lines = []
+        elif line.startswith(b"event:"):
+            event_type = line[6:].strip().decode()
+        elif line.startswith(b"data:"):
+            data_lines.append(line[5:].lstrip())
+    
+    if data_lines:
+        yield event_type, json_loads(b"\n".join(data_lines))
+
+
 def generate_tts_streaming(
     text: str,
     voice_uuid: str = None,
@@ -181,13 +226,14 @@ def generate_tts_streaming(
     """
     Generate TTS with streaming (SSE).
     
+    Chunks are appended to output_path as they arrive, so the whole audio
+    is never held in memory.
+    
     Args:
         text: Text to synthesize
         voice_uuid: UUID of uploaded voice (optional)
         output_path: Path to save concatenated audio
     """
-    import sseclient  # pip install sseclient-py
-    
     url = f"{API_BASE_URL}/tts/generate/stream"
     
     payload = {
@@ -197,40 +243,43 @@ def generate_tts_streaming(
         payload["voice_uuid"] = voice_uuid
     
     # Make streaming request
-    response = requests.post(url, json=payload, stream=True)
+    response = SESSION.post(url, json=payload, stream=True)
     response.raise_for_status()
     
-    client = sseclient.SSEClient(response)
+    failed = False
     
-    audio_chunks = []
-    
-    for event in client.events():
-        data = json.loads(event.data)
-        event_type = data.get("event", event.event)
-        
-        if event_type == "progress":
-            print(f"Processing segment {data['segment']}/{data['total_segments']}...")
-        
-        elif event_type == "audio_chunk":
-            print(f"Received chunk {data['segment']}, duration: {data['duration']:.2f}s")
-            audio_chunks.append(base64.b64decode(data["audio_base64"]))
-        
-        elif event_type == "done":
-            print(f"Done! Total duration: {data['total_duration_seconds']:.2f}s")
+    with open(output_path, "wb") as f:
+        for event_type, data in _sse_events(response):
+            event_type = data.get("event", event_type)
+            
+            if event_type == "progress":
+                print(f"Processing segment {data['segment']}/{data['total_segments']}...")
+            
+            elif event_type == "audio_chunk":
+                print(f"Received chunk {data['segment']}, duration: {data['duration']:.2f}s")
+                wav = base64.b64decode(data["audio_base64"])
+                # Keep the first chunk's header; later chunks add only samples
+                f.write(wav if f.tell() == 0 else wav[WAV_HEADER_SIZE:])
+            
+            elif event_type == "done":
+                print(f"Done! Total duration: {data['total_duration_seconds']:.2f}s")
+            
+            elif event_type == "error":
+                print(f"Error: {data['message']}")
+                failed = True
+                break
         
-        elif event_type == "error":
-            print(f"Error: {data['message']}")
-            return
+        file_size = f.tell()
+        if not failed and file_size > WAV_HEADER_SIZE:
+            # Patch the RIFF and data chunk sizes to cover all chunks
+            f.seek(4)
+            f.write(struct.pack("<I", file_size - 8))
+            f.seek(WAV_HEADER_SIZE - 4)
+            f.write(struct.pack("<I", file_size - WAV_HEADER_SIZE))
     
-    # Save concatenated audio
-    # Note: This is a simplified version - proper concatenation would need
-    # to parse WAV headers. For production, request base64 and concatenate
-    # the numpy arrays before encoding.
-    if audio_chunks:
-        # For simplicity, just save the first chunk
-        # In production, you'd properly concatenate WAV files
-        with open(output_path, "wb") as f:
-            f.write(audio_chunks[0])  # Simplified
+    if failed or file_size <= WAV_HEADER_SIZE:
+        os.remove(output_path)
+    else:
         print(f"Audio saved to: {output_path}")
 
 
@@ -245,7 +294,7 @@ def main():
     
     # Check API is running
     try:
-        response = requests.get(f"{API_BASE_URL}/")
+        response = SESSION.get(f"{API_BASE_URL}/")
         print(f"API Status: {response.json()['status']}")
     except requests.exceptions.ConnectionError:
         print("Error: Cannot connect to API. Make sure the server is running.")
@@ -256,7 +305,6 @@ def main():
     result = generate_tts(
         text="你好，这是一个语音合成测试。VoxCPM是一个先进的端到端TTS模型。",
         output_path="output_simple.wav",
-        output_format="base64",
     )
     print(f"Generated {result['duration_seconds']:.2f}s of audio\n")
     
@@ -278,7 +326,6 @@ def main():
             text="这段语音使用了上传的参考音频进行声音克隆。",
             voice_uuid=voice["voice_uuid"],
             output_path="output_cloned.wav",
-            output_format="base64",
         )
         print(f"Generated {result['duration_seconds']:.2f}s of cloned audio\n")
         
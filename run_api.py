@@ -28,7 +28,7 @@ def main():
     parser.add_argument("--port", type=int, default=None, help="Port to bind")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
     parser.add_argument("--model-path", type=str, default=None, help="Path to local model")
-    parser.add_argument("--workers", type=int, default=1, help="Number of workers")
+    parser.add_argument("--workers", type=int, default=None, help="Audio encoding threads (2-4, default 2)")
     
     args = parser.parse_args()
     
@@ -62,14 +62,35 @@ def main():
     print(f"ReDoc:      http://{settings.host}:{settings.port}/redoc")
     print("=" * 60)
     
-    uvicorn.run(
-        "api.main:app",
+    # uvloop + httptools ship with uvicorn[standard]; uvloop has no Windows build
+    loop = "asyncio" if sys.platform == "win32" else "uvloop"
+    
+    if settings.debug:
+        # Reload needs an import string so the reloader can re-import the app
+        uvicorn.run(
+            "api.main:app",
+            host=settings.host,
+            port=settings.port,
+            reload=True,
+            log_level="debug",
+            loop=loop,
+            http="httptools",
+        )
+        return
+    
+    # Serve the imported app object directly in a single process
+    from api.main import app
+    
+    config = uvicorn.Config(
+        app,
         host=settings.host,
         port=settings.port,
-        reload=settings.debug,
-        log_level="debug" if settings.debug else "info",
+        log_level="info",
+        loop=loop,
+        http="httptools",
         workers=1,  # Must be 1 for GPU model (can't share across workers)
     )
+    uvicorn.Server(config).run()
 
 
 if __name__ == "__main__":
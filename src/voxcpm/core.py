@@ -3,7 +3,7 @@ import sys
 import re
 import tempfile
 import numpy as np
-from typing import Generator, Optional
+from typing import BinaryIO, Generator, Optional, Union
 from huggingface_hub import snapshot_download
 from .model.voxcpm import VoxCPMModel, LoRAConfig
 
@@ -134,6 +134,47 @@ class VoxCPM:
     def generate_streaming(self, *args, **kwargs) -> Generator[np.ndarray, None, None]:
         return self._generate(*args, streaming=True, **kwargs)
 
+    def build_prompt_cache(self, prompt_wav_path: Union[str, BinaryIO], prompt_text: str, denoise: bool = False) -> dict:
+        """Encode a reference prompt once so it can be reused across generate calls.
+
+        Args:
+            prompt_wav_path: Path to a reference audio file for prompting, or
+                a binary file-like object with the audio file contents.
+            prompt_text: Text content corresponding to the prompt audio.
+            denoise: Whether to denoise the prompt audio if a denoiser is
+                available.
+        Returns:
+            dict: Prompt cache to pass as ``prompt_cache`` to ``generate``.
+        """
+        is_path = isinstance(prompt_wav_path, (str, os.PathLike))
+        if is_path and not os.path.exists(prompt_wav_path):
+            raise FileNotFoundError(f"prompt_wav_path does not exist: {prompt_wav_path}")
+
+        temp_paths = []
+        try:
+            if denoise and self.denoiser is not None:
+                if not is_path:
+                    # The denoiser only reads files
+                    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
+                        temp_paths.append(tmp_file.name)
+                        tmp_file.write(prompt_wav_path.read())
+                    prompt_wav_path = tmp_file.name
+                with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
+                    temp_paths.append(tmp_file.name)
+                self.denoiser.enhance(prompt_wav_path, output_path=tmp_file.name)
+                prompt_wav_path = tmp_file.name
+            return self.tts_model.build_prompt_cache(
+                prompt_wav_path=prompt_wav_path,
+                prompt_text=prompt_text
+            )
+        finally:
+            for temp_path in temp_paths:
+                if os.path.exists(temp_path):
+                    try:
+                        os.unlink(temp_path)
+                    except OSError:
+                        pass
+
     def _generate(self, 
             text : str,
             prompt_wav_path : str = None,
@@ -147,6 +188,7 @@ class VoxCPM:
             retry_badcase : bool = True,
             retry_badcase_max_times : int = 3,
             retry_badcase_ratio_threshold : float = 6.0,
+            prompt_cache : dict = None,
             streaming: bool = False,
         ) -> Generator[np.ndarray, None, None]:
         """Synthesize speech for the given text and return a single waveform.
@@ -170,6 +212,9 @@ class VoxCPM:
             retry_badcase: Whether to retry badcase.
             retry_badcase_max_times: Maximum number of times to retry badcase.
             retry_badcase_ratio_threshold: Threshold for audio-to-text ratio.
+            prompt_cache: Prompt cache from ``build_prompt_cache``; when given,
+                ``prompt_wav_path``/``prompt_text``/``denoise`` are ignored and
+                the prompt audio is not re-encoded.
             streaming: Whether to return a generator of audio chunks.
         Returns:
             Generator of numpy.ndarray: 1D waveform array (float32) on CPU. 
@@ -179,6 +224,9 @@ class VoxCPM:
         if not text.strip() or not isinstance(text, str):
             raise ValueError("target text must be a non-empty string")
         
+        if prompt_cache is not None:
+            prompt_wav_path = prompt_text = None
+        
         if prompt_wav_path is not None:
             if not os.path.exists(prompt_wav_path):
                 raise FileNotFoundError(f"prompt_wav_path does not exist: {prompt_wav_path}")
@@ -188,50 +236,35 @@ class VoxCPM:
         
         text = text.replace("\n", " ")
         text = re.sub(r'\s+', ' ', text)
-        temp_prompt_wav_path = None
         
-        try:
-            if prompt_wav_path is not None and prompt_text is not None:
-                if denoise and self.denoiser is not None:
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-                        temp_prompt_wav_path = tmp_file.name
-                    self.denoiser.enhance(prompt_wav_path, output_path=temp_prompt_wav_path)
-                    prompt_wav_path = temp_prompt_wav_path
-                fixed_prompt_cache = self.tts_model.build_prompt_cache(
-                    prompt_wav_path=prompt_wav_path,
-                    prompt_text=prompt_text
-                )
-            else:
-                fixed_prompt_cache = None  # will be built from the first inference
-            
-            if normalize:
-                if self.text_normalizer is None:
-                    from .utils.text_normalize import TextNormalizer
-                    self.text_normalizer = TextNormalizer()
-                text = self.text_normalizer.normalize(text)
-            
-            generate_result = self.tts_model._generate_with_prompt_cache(
-                            target_text=text,
-                            prompt_cache=fixed_prompt_cache,
-                            min_len=min_len,
-                            max_len=max_len,
-                            inference_timesteps=inference_timesteps,
-                            cfg_value=cfg_value,
-                            retry_badcase=retry_badcase,
-                            retry_badcase_max_times=retry_badcase_max_times,
-                            retry_badcase_ratio_threshold=retry_badcase_ratio_threshold,
-                            streaming=streaming,
-                        )
+        if prompt_cache is not None:
+            fixed_prompt_cache = prompt_cache
+        elif prompt_wav_path is not None and prompt_text is not None:
+            fixed_prompt_cache = self.build_prompt_cache(prompt_wav_path, prompt_text, denoise=denoise)
+        else:
+            fixed_prompt_cache = None  # will be built from the first inference
         
-            for wav, _, _ in generate_result:
-                yield wav.squeeze(0).cpu().numpy()
+        if normalize:
+            if self.text_normalizer is None:
+                from .utils.text_normalize import TextNormalizer
+                self.text_normalizer = TextNormalizer()
+            text = self.text_normalizer.normalize(text)
         
-        finally:
-            if temp_prompt_wav_path and os.path.exists(temp_prompt_wav_path):
-                try:
-                    os.unlink(temp_prompt_wav_path)
-                except OSError:
-                    pass
+        generate_result = self.tts_model._generate_with_prompt_cache(
+                        target_text=text,
+                        prompt_cache=fixed_prompt_cache,
+                        min_len=min_len,
+                        max_len=max_len,
+                        inference_timesteps=inference_timesteps,
+                        cfg_value=cfg_value,
+                        retry_badcase=retry_badcase,
+                        retry_badcase_max_times=retry_badcase_max_times,
+                        retry_badcase_ratio_threshold=retry_badcase_ratio_threshold,
+                        streaming=streaming,
+                    )
+        
+        for wav, _, _ in generate_result:
+            yield wav.squeeze(0).cpu().numpy()
 
     # ------------------------------------------------------------------ #
     # LoRA Interface (delegated to VoxCPMModel)
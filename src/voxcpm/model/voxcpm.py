@@ -483,7 +483,7 @@ class VoxCPMModel(nn.Module):
         
         Args:
             prompt_text: prompt text (required)
-            prompt_wav_path: prompt audio path (required)
+            prompt_wav_path: prompt audio path or binary file-like object (required)
             
         Returns:
             prompt_cache: dict with prompt_text (raw text) and audio features.